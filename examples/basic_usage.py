@@ -15,23 +15,28 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from emulator import AdvancedLLMEmulator
 
 
+def emit(lines):
+    """Write a section's lines to stdout in a single buffered write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 def main():
     """Demonstrate basic emulator functionality."""
     
-    print("🤖 The Emulator - Basic Usage Example")
-    print("=" * 50)
+    lines = ["🤖 The Emulator - Basic Usage Example", "=" * 50]
     
     # Initialize the emulator
-    print("\n1. Initializing Advanced LLM Emulator...")
+    lines.append("\n1. Initializing Advanced LLM Emulator...")
     emulator = AdvancedLLMEmulator(personality="curious_researcher")
     
     # Get personality information
     personality_info = emulator.get_personality_info()
-    print(f"   Personality: {personality_info['personality']}")
-    print(f"   Session ID: {personality_info['session_id']}")
+    lines.append(f"   Personality: {personality_info['personality']}")
+    lines.append(f"   Session ID: {personality_info['session_id']}")
+    emit(lines)
     
     # Test basic conversation
-    print("\n2. Testing Basic Conversation...")
+    lines = ["\n2. Testing Basic Conversation..."]
     questions = [
         "Hello! Can you introduce yourself?",
         "What are your main capabilities?",
@@ -40,12 +45,13 @@ def main():
     ]
     
     for i, question in enumerate(questions, 1):
-        print(f"\n   Q{i}: {question}")
+        lines.append(f"\n   Q{i}: {question}")
         response = emulator.get_decision(question)
-        print(f"   A{i}: {response}")
+        lines.append(f"   A{i}: {response}")
+    emit(lines)
     
     # Test knowledge management
-    print("\n3. Testing Knowledge Management...")
+    lines = ["\n3. Testing Knowledge Management..."]
     
     # Store some knowledge
     emulator.store_knowledge("favorite_color", "quantum blue")
@@ -56,11 +62,12 @@ def main():
     color = emulator.retrieve_knowledge("favorite_color")
     languages = emulator.retrieve_knowledge("programming_languages")
     
-    print(f"   Stored favorite color: {color}")
-    print(f"   Stored languages: {languages}")
+    lines.append(f"   Stored favorite color: {color}")
+    lines.append(f"   Stored languages: {languages}")
+    emit(lines)
     
     # Test emotional analysis
-    print("\n4. Testing Emotional Analysis...")
+    lines = ["\n4. Testing Emotional Analysis..."]
     test_texts = [
         "I'm so excited about this new project!",
         "I'm feeling a bit confused about this concept.",
@@ -68,27 +75,29 @@ def main():
         "I'm worried about the deadline approaching."
     ]
     
-    for text in test_texts:
-        emotion_analysis = emulator.analyze_emotion(text)
-        print(f"   Text: '{text}'")
-        print(f"   Detected emotion: {emotion_analysis}")
+    for text, emotion_analysis in zip(test_texts, emulator.analyze_emotions(test_texts)):
+        lines.append(f"   Text: '{text}'")
+        lines.append(f"   Detected emotion: {emotion_analysis}")
+    emit(lines)
     
     # Test capabilities
-    print("\n5. Checking System Capabilities...")
+    lines = ["\n5. Checking System Capabilities..."]
     capabilities = emulator.get_capabilities()
     for capability, enabled in capabilities.items():
         status = "✅ Enabled" if enabled else "❌ Disabled"
-        print(f"   {capability}: {status}")
+        lines.append(f"   {capability}: {status}")
+    emit(lines)
     
     # Get session statistics
-    print("\n6. Session Statistics...")
+    lines = ["\n6. Session Statistics..."]
     stats = emulator.get_session_stats()
-    print(f"   Interactions: {stats['interactions_count']}")
-    print(f"   Knowledge entries: {stats['knowledge_entries']}")
-    print(f"   Current emotional state: {stats['current_emotion']}")
+    lines.append(f"   Interactions: {stats['interactions_count']}")
+    lines.append(f"   Knowledge entries: {stats['knowledge_entries']}")
+    lines.append(f"   Current emotional state: {stats['current_emotion']}")
     
-    print("\n🎉 Basic usage demonstration complete!")
-    print("\nThe Emulator is ready for advanced AI emulation tasks.")
+    lines.append("\n🎉 Basic usage demonstration complete!")
+    lines.append("\nThe Emulator is ready for advanced AI emulation tasks.")
+    emit(lines)
 
 
 if __name__ == "__main__":
@@ -16,6 +16,7 @@ Environment Variables:
 
 import asyncio
 import os
+import re
 import sys
 import logging
 from pathlib import Path
@@ -39,18 +40,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# KEY=VALUE assignments in a .env file (blank lines and # comments never match)
+_ENV_LINE_RE = re.compile(r'^[ \t]*([^#=\s][^=\n]*)=(.*)$', re.MULTILINE)
+
 
 def load_environment():
     """Load environment variables from .env file if it exists."""
     env_file = Path(__file__).parent / ".env"
     if env_file.exists():
         print(f"📄 Loading environment from {env_file}")
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+        for match in _ENV_LINE_RE.finditer(env_file.read_text()):
+            os.environ[match.group(1).strip()] = match.group(2).strip()
 
 
 def validate_configuration():
@@ -133,6 +133,13 @@ if __name__ == "__main__":
         print("❌ Python 3.8 or higher is required")
         sys.exit(1)
     
+    # Use uvloop's faster event loop when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Run the bot
     try:
         asyncio.run(main())
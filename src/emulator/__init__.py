@@ -9,19 +9,42 @@ Author: rabit232
 License: MIT
 """
 
-from .core import AdvancedLLMEmulator
-from .emotions import EmotionalIntelligence
-from .languages import MultiLanguageSupport
-from .knowledge import KnowledgeManager
-from .settings_manager import AdvancedSettingsManager
-
-# Matrix bot import (optional, graceful fallback if dependencies missing)
-try:
-    from .matrix_bot import EmulatorMatrixBot
-    MATRIX_AVAILABLE = True
-except ImportError:
-    MATRIX_AVAILABLE = False
-    EmulatorMatrixBot = None
+import importlib
+
+# Public names are resolved lazily (PEP 562) so importing the package only
+# loads the submodules that are actually used.
+_LAZY_ATTRIBUTES = {
+    "AdvancedLLMEmulator": ".core",
+    "EmotionalIntelligence": ".emotions",
+    "MultiLanguageSupport": ".languages",
+    "KnowledgeManager": ".knowledge",
+    "AdvancedSettingsManager": ".settings_manager",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    
+    if name in ("EmulatorMatrixBot", "MATRIX_AVAILABLE"):
+        # Matrix bot import (optional, graceful fallback if dependencies missing)
+        try:
+            from .matrix_bot import EmulatorMatrixBot
+            matrix_available = True
+        except ImportError:
+            EmulatorMatrixBot = None
+            matrix_available = False
+        globals().update(EmulatorMatrixBot=EmulatorMatrixBot, MATRIX_AVAILABLE=matrix_available)
+        return globals()[name]
+    
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 __version__ = "1.1.0"
 __author__ = "rabit232"
@@ -8,8 +8,12 @@ with emotional intelligence and multi-step reasoning capabilities.
 import logging
 import random
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import re
+import secrets
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Any, Mapping, Optional, Tuple
+from dataclasses import dataclass, asdict
 
 from .emotions import EmotionalIntelligence
 from .languages import MultiLanguageSupport
@@ -17,6 +21,102 @@ from .knowledge import KnowledgeManager
 
 logger = logging.getLogger(__name__)
 
+# Response categories, in the priority order used when several match
+_PROGRAMMING, _EXPLANATORY, _CREATIVE, _GENERAL = range(4)
+
+# Prompt classification patterns, compiled once at import time. The category
+# alternation sits in a lookahead so every keyword occurrence is reported and
+# the highest-priority category is found in a single scan.
+_CATEGORY_RE = re.compile(
+    r'(?=(?P<programming>code|program|function|class)'
+    r'|(?P<explanatory>explain|what|how|why)'
+    r'|(?P<creative>create|make|build|design))',
+    re.IGNORECASE
+)
+_CATEGORY_RANKS = {'programming': _PROGRAMMING, 'explanatory': _EXPLANATORY, 'creative': _CREATIVE}
+_LANGUAGE_RE = re.compile(r'python|javascript|rust|java', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PersonalityTraits:
+    """Immutable personality configuration shared by all emulator instances."""
+    __slots__ = ('core_traits', 'response_style', 'emotional_tendency')
+    
+    core_traits: Tuple[str, ...]
+    response_style: str
+    emotional_tendency: str
+
+
+_PERSONALITIES: Dict[str, PersonalityTraits] = {
+    'curious_researcher': PersonalityTraits(
+        core_traits=('curious', 'analytical', 'methodical', 'truth-seeking'),
+        response_style='detailed_explanatory',
+        emotional_tendency='intellectual_excitement'
+    ),
+    'creative_assistant': PersonalityTraits(
+        core_traits=('creative', 'enthusiastic', 'supportive', 'innovative'),
+        response_style='encouraging_creative',
+        emotional_tendency='optimistic_energy'
+    ),
+    'wise_mentor': PersonalityTraits(
+        core_traits=('wise', 'patient', 'insightful', 'nurturing'),
+        response_style='thoughtful_guidance',
+        emotional_tendency='calm_wisdom'
+    )
+}
+
+# Core capabilities, shared read-only by all instances; the public API hands out dict copies
+_CAPABILITIES: Mapping[str, bool] = MappingProxyType({
+    'vision_processing': True,
+    'multi_step_reasoning': True,
+    'knowledge_management': True,
+    'emotional_intelligence': True,
+    'code_generation': True,
+    'adaptive_learning': True
+})
+
+# Response templates; only the selected template is formatted per call
+_PROGRAMMING_RESPONSES = (
+    "I'd be delighted to help with that programming challenge! Based on my analysis, this appears to be a {adjective} problem.",
+    "Excellent question about programming! Let me approach this systematically, considering both efficiency and readability.",
+    "This is a great programming inquiry! I'll provide a solution that follows best practices and includes proper documentation."
+)
+_PROGRAMMING_ADJECTIVES = ('fascinating', 'intriguing', 'well-structured')
+_LANGUAGE_INSIGHT = "\n\nFor this particular language, I recommend focusing on {focus}."
+_LANGUAGE_FOCUSES = ('clean syntax', 'performance optimization', 'error handling', 'maintainability')
+_EXPLANATORY_RESPONSES = (
+    "What a {modifier} question! Let me break this down systematically for you.",
+    "I find this topic absolutely {modifier}! Here's my comprehensive analysis:",
+    "This is a {modifier} area of inquiry. Allow me to explain the key concepts:"
+)
+_EXPLANATORY_ELABORATION = ("\n\nFrom my knowledge base, I can tell you that this involves multiple "
+                            "interconnected concepts that work together in fascinating ways.")
+_CREATIVE_RESPONSES = (
+    "What an exciting creative challenge! I'm energized by the possibilities here.",
+    "I love creative projects like this! Let me share some innovative approaches.",
+    "This sparks my imagination! Here are some creative solutions I can envision:"
+)
+_GENERAL_RESPONSES = (
+    "That's a {modifier} point you've raised! I appreciate the opportunity to explore this with you.",
+    "I find your perspective quite {modifier}. Let me share my thoughts on this matter.",
+    "What a {modifier} topic for discussion! I'm eager to dive into this with you."
+)
+_FALLBACK_RESPONSE = ("I apologize, but I encountered an issue processing your request. "
+                      "However, I'm still here and ready to help! Could you please rephrase "
+                      "your question or provide additional context?")
+
+
+def _response_category(prompt: str) -> int:
+    """Return the highest-priority response category matched by the prompt."""
+    best = _GENERAL
+    for match in _CATEGORY_RE.finditer(prompt):
+        rank = _CATEGORY_RANKS[match.lastgroup]
+        if rank < best:
+            best = rank
+            if rank == _PROGRAMMING:
+                break
+    return best
+
 
 class AdvancedLLMEmulator:
     """
@@ -27,6 +127,11 @@ class AdvancedLLMEmulator:
     available or desired.
     """
     
+    __slots__ = (
+        'personality', 'session_id', 'emotions', 'languages', 'knowledge',
+        'capabilities', '_personality_config', '_dispatch', '_rng'
+    )
+    
     def __init__(self, personality: str = "curious_researcher", 
                  knowledge_file: Optional[str] = None):
         """
@@ -39,41 +144,27 @@ class AdvancedLLMEmulator:
         self.personality = personality
         self.session_id = self._generate_session_id()
         
+        # Per-instance generator for response selection, so emulators used from
+        # different threads never share random state
+        self._rng = random.Random()
+        
         # Initialize core components
         self.emotions = EmotionalIntelligence()
         self.languages = MultiLanguageSupport()
         self.knowledge = KnowledgeManager(knowledge_file)
         
         # Core capabilities
-        self.capabilities = {
-            'vision_processing': True,
-            'multi_step_reasoning': True,
-            'knowledge_management': True,
-            'emotional_intelligence': True,
-            'code_generation': True,
-            'adaptive_learning': True
-        }
+        self.capabilities = _CAPABILITIES
         
-        # Personality traits
-        self.personality_traits = {
-            'curious_researcher': {
-                'core_traits': ['curious', 'analytical', 'methodical', 'truth-seeking'],
-                'response_style': 'detailed_explanatory',
-                'emotional_tendency': 'intellectual_excitement'
-            },
-            'creative_assistant': {
-                'core_traits': ['creative', 'enthusiastic', 'supportive', 'innovative'],
-                'response_style': 'encouraging_creative',
-                'emotional_tendency': 'optimistic_energy'
-            },
-            'wise_mentor': {
-                'core_traits': ['wise', 'patient', 'insightful', 'nurturing'],
-                'response_style': 'thoughtful_guidance',
-                'emotional_tendency': 'calm_wisdom'
-            }
-        }
+        # Personality configuration (shared, immutable)
+        self._personality_config = _PERSONALITIES.get(
+            personality, _PERSONALITIES['curious_researcher']
+        )
+        
+        # Response dispatcher specialized for this personality
+        self._dispatch = self._build_dispatcher()
         
-        logger.info(f"AdvancedLLMEmulator initialized with personality: {personality}")
+        logger.info("AdvancedLLMEmulator initialized with personality: %s", personality)
     
     def get_decision(self, prompt: str, context: Optional[Dict] = None) -> str:
         """
@@ -87,30 +178,48 @@ class AdvancedLLMEmulator:
             Sophisticated AI-generated response
         """
         try:
-            # Process emotional context
-            current_emotion = self.emotions.analyze_prompt_emotion(prompt)
-            
-            # Generate contextual response
-            response = self._generate_contextual_response(prompt, current_emotion, context)
-            
-            # Store interaction in knowledge base
-            self.knowledge.store_interaction(prompt, response, current_emotion)
-            
-            return response
-            
+            current_emotion, response = self._compute_response(prompt, context)
         except Exception as e:
-            logger.error(f"Error generating decision: {e}")
+            logger.error("Error generating decision: %s", e)
             return self._fallback_response(prompt)
+        
+        # Store interaction in knowledge base; this only queues it, and the
+        # background writer handles (and absorbs) any I/O failure
+        self.knowledge.store_interaction(prompt, response, current_emotion)
+        
+        return response
+    
+    def _compute_response(self, prompt: str, context: Optional[Dict] = None) -> tuple:
+        """
+        Compute the (emotion, response) pair for a prompt.
+        
+        Not memoized: replies are chosen at random and emotion analysis
+        updates the emotional state, so both run on every call. The prompt
+        classification underneath is cached by the emotions module.
+        """
+        emotion = self.emotions.analyze_prompt_emotion(prompt)
+        return emotion, self._generate_contextual_response(prompt, emotion, context)
+    
+    def close(self) -> None:
+        """Write pending knowledge and interactions and stop background writers."""
+        self.knowledge.close()
     
     def get_capabilities(self) -> Dict[str, bool]:
         """Return the current capabilities of the emulator."""
-        return self.capabilities.copy()
+        return dict(self.capabilities)
     
     def get_personality_info(self) -> Dict[str, Any]:
         """Return information about the current personality configuration."""
+        config = _PERSONALITIES.get(self.personality)
+        # Unknown personalities report no traits; the shared config keeps its
+        # sequences as tuples, but callers get plain lists
+        traits = {} if config is None else {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in asdict(config).items()
+        }
         return {
             'personality': self.personality,
-            'traits': self.personality_traits.get(self.personality, {}),
+            'traits': traits,
             'session_id': self.session_id,
             'emotional_state': self.emotions.get_current_state()
         }
@@ -140,6 +249,18 @@ class AdvancedLLMEmulator:
         """
         return self.emotions.analyze_text_emotion(text)
     
+    def analyze_emotions(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the emotional content of several texts in one batch.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Emotional analysis results, one per text
+        """
+        return self.emotions.analyze_texts_batch(texts)
+    
     def store_knowledge(self, key: str, value: Any) -> bool:
         """
         Store information in the knowledge base.
@@ -168,81 +289,69 @@ class AdvancedLLMEmulator:
     def _generate_contextual_response(self, prompt: str, emotion: str, 
                                     context: Optional[Dict] = None) -> str:
         """Generate a contextual response based on prompt, emotion, and context."""
+        return self._dispatch(prompt, emotion)
+    
+    def _build_dispatcher(self) -> Callable[[str, str], str]:
+        """
+        Build a response dispatcher specialized for this instance.
+        
+        The personality is fixed for the lifetime of the emulator, so its
+        configuration and the per-category generators are bound once here;
+        each call then costs one category scan and one indexed call.
+        """
+        config = self._personality_config
+        programming = self._generate_programming_response
+        explanatory = self._generate_explanatory_response
+        creative = self._generate_creative_response
+        general = self._generate_general_response
         
-        # Get personality configuration
-        personality_config = self.personality_traits.get(
-            self.personality, self.personality_traits['curious_researcher']
+        handlers = (
+            lambda prompt, emotion: programming(prompt, config),
+            lambda prompt, emotion: explanatory(prompt, emotion, config),
+            lambda prompt, emotion: creative(prompt, config),
+            lambda prompt, emotion: general(prompt, emotion, config),
         )
         
-        # Determine response type based on prompt analysis
-        if any(word in prompt.lower() for word in ['code', 'program', 'function', 'class']):
-            return self._generate_programming_response(prompt, personality_config)
-        elif any(word in prompt.lower() for word in ['explain', 'what', 'how', 'why']):
-            return self._generate_explanatory_response(prompt, emotion, personality_config)
-        elif any(word in prompt.lower() for word in ['create', 'make', 'build', 'design']):
-            return self._generate_creative_response(prompt, personality_config)
-        else:
-            return self._generate_general_response(prompt, emotion, personality_config)
+        def dispatch(prompt: str, emotion: str) -> str:
+            return handlers[_response_category(prompt)](prompt, emotion)
+        
+        return dispatch
     
-    def _generate_programming_response(self, prompt: str, config: Dict) -> str:
+    def _generate_programming_response(self, prompt: str, config: PersonalityTraits) -> str:
         """Generate a programming-focused response."""
-        responses = [
-            f"I'd be delighted to help with that programming challenge! Based on my analysis, this appears to be a {random.choice(['fascinating', 'intriguing', 'well-structured'])} problem.",
-            f"Excellent question about programming! Let me approach this systematically, considering both efficiency and readability.",
-            f"This is a great programming inquiry! I'll provide a solution that follows best practices and includes proper documentation."
-        ]
-        
-        base_response = random.choice(responses)
+        base_response = self._rng.choice(_PROGRAMMING_RESPONSES).format(
+            adjective=self._rng.choice(_PROGRAMMING_ADJECTIVES)
+        )
         
         # Add language-specific insights
-        if any(lang in prompt.lower() for lang in ['python', 'javascript', 'rust', 'java']):
-            lang_insight = f"\n\nFor this particular language, I recommend focusing on {random.choice(['clean syntax', 'performance optimization', 'error handling', 'maintainability'])}."
-            base_response += lang_insight
+        if _LANGUAGE_RE.search(prompt):
+            base_response += _LANGUAGE_INSIGHT.format(focus=self._rng.choice(_LANGUAGE_FOCUSES))
         
         return base_response
     
-    def _generate_explanatory_response(self, prompt: str, emotion: str, config: Dict) -> str:
+    def _generate_explanatory_response(self, prompt: str, emotion: str, config: PersonalityTraits) -> str:
         """Generate an explanatory response."""
         emotional_modifier = self.emotions.get_emotional_modifier(emotion)
-        
-        responses = [
-            f"What a {emotional_modifier} question! Let me break this down systematically for you.",
-            f"I find this topic absolutely {emotional_modifier}! Here's my comprehensive analysis:",
-            f"This is a {emotional_modifier} area of inquiry. Allow me to explain the key concepts:"
-        ]
-        
-        base_response = random.choice(responses)
+        base_response = self._rng.choice(_EXPLANATORY_RESPONSES).format(modifier=emotional_modifier)
         
         # Add personality-specific elaboration
-        if config['response_style'] == 'detailed_explanatory':
-            base_response += f"\n\nFrom my knowledge base, I can tell you that this involves multiple interconnected concepts that work together in fascinating ways."
+        if config.response_style == 'detailed_explanatory':
+            base_response += _EXPLANATORY_ELABORATION
         
         return base_response
     
-    def _generate_creative_response(self, prompt: str, config: Dict) -> str:
+    def _generate_creative_response(self, prompt: str, config: PersonalityTraits) -> str:
         """Generate a creative/constructive response."""
-        responses = [
-            "What an exciting creative challenge! I'm energized by the possibilities here.",
-            "I love creative projects like this! Let me share some innovative approaches.",
-            "This sparks my imagination! Here are some creative solutions I can envision:"
-        ]
-        
-        return random.choice(responses)
+        return self._rng.choice(_CREATIVE_RESPONSES)
     
-    def _generate_general_response(self, prompt: str, emotion: str, config: Dict) -> str:
+    def _generate_general_response(self, prompt: str, emotion: str, config: PersonalityTraits) -> str:
         """Generate a general conversational response."""
         # Get detailed emotional analysis
-        emotion_analysis = self.emotions.analyze_text_emotion(prompt)
+        emotion_analysis = self.emotions.analyze_text_emotion(prompt, emotion)
         emotional_modifier = self.emotions.get_emotional_modifier(emotion)
         
         # Generate base response
-        responses = [
-            f"That's a {emotional_modifier} point you've raised! I appreciate the opportunity to explore this with you.",
-            f"I find your perspective quite {emotional_modifier}. Let me share my thoughts on this matter.",
-            f"What a {emotional_modifier} topic for discussion! I'm eager to dive into this with you."
-        ]
-        
-        base_response = random.choice(responses)
+        base_response = self._rng.choice(_GENERAL_RESPONSES).format(modifier=emotional_modifier)
         
         # Apply emotional enhancement if intensity is high
         if emotion_analysis['intensity'] > 0.6:
@@ -254,15 +363,11 @@ class AdvancedLLMEmulator:
     
     def _fallback_response(self, prompt: str) -> str:
         """Provide a fallback response when normal processing fails."""
-        return ("I apologize, but I encountered an issue processing your request. "
-                "However, I'm still here and ready to help! Could you please rephrase "
-                "your question or provide additional context?")
+        return _FALLBACK_RESPONSE
     
     def _generate_session_id(self) -> str:
         """Generate a unique session identifier."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        random_suffix = random.randint(1000, 9999)
-        return f"emulator_{timestamp}_{random_suffix}"
+        return f"emulator_{time.time_ns():x}_{secrets.token_hex(2)}"
     
     def get_session_stats(self) -> Dict[str, Any]:
         """Get statistics about the current session."""
@@ -272,5 +377,5 @@ class AdvancedLLMEmulator:
             'interactions_count': self.knowledge.get_interaction_count(),
             'knowledge_entries': self.knowledge.get_knowledge_count(),
             'current_emotion': self.emotions.get_current_state(),
-            'capabilities': self.capabilities
+            'capabilities': dict(self.capabilities)
         }
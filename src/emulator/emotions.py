@@ -10,24 +10,377 @@ Based on the enhanced_emotions.py from Ribit 2.0 collection.
 
 import random
 import json
-from typing import Dict, List, Tuple, Any, Optional
+import re
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-@dataclass
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Prompt emotion triggers in priority order: when several categories match,
+# the one listed first wins.
+_EMOTION_TRIGGERS = (
+    ('EXCITEMENT', ('excited', 'amazing', 'wonderful', 'fantastic', 'incredible')),
+    ('CURIOSITY', ('how', 'why', 'what', 'explain', 'tell me about', 'curious')),
+    ('CONFUSION', ('confused', 'unclear', 'don\'t understand', 'help')),
+    ('GRATITUDE', ('thank', 'appreciate', 'grateful', 'thanks')),
+    ('EMPATHY', ('sad', 'frustrated', 'difficult', 'struggling', 'problem')),
+    ('WONDER', ('beautiful', 'elegant', 'fascinating', 'remarkable')),
+)
+# Keyword -> (rank, emotion) lookup shared by both matchers below. A keyword
+# listed under several emotions keeps its highest-priority entry.
+_KEYWORD_EMOTIONS: Dict[str, Tuple[int, str]] = {}
+for _rank, (_emotion, _keywords) in enumerate(_EMOTION_TRIGGERS):
+    for _word in _keywords:
+        _KEYWORD_EMOTIONS.setdefault(_word, (_rank, _emotion))
+del _rank, _emotion, _keywords, _word
+
+if AHOCORASICK_AVAILABLE:
+    # Aho-Corasick automaton over every keyword, so a single linear pass
+    # reports all trigger hits without regex backtracking.
+    _EMOTION_AUTOMATON = ahocorasick.Automaton()
+    for _word, _hit in _KEYWORD_EMOTIONS.items():
+        _EMOTION_AUTOMATON.add_word(_word, _hit)
+    _EMOTION_AUTOMATON.make_automaton()
+    del _word, _hit
+    
+    def _iter_trigger_hits(text_lower: str):
+        """Yield (rank, emotion) for each keyword occurrence in lowercased text."""
+        for _, hit in _EMOTION_AUTOMATON.iter(text_lower):
+            yield hit
+else:
+    # Single-pass fallback matcher. The keyword alternation sits in a
+    # lookahead so overlapping keywords are all reported, and keywords are
+    # ordered by priority so the best one starting at each offset wins.
+    _EMOTION_TRIGGER_RE = re.compile('(?=(' + '|'.join(
+        re.escape(word) for word in _KEYWORD_EMOTIONS
+    ) + '))')
+    
+    def _iter_trigger_hits(text_lower: str):
+        """Yield (rank, emotion) for each keyword occurrence in lowercased text."""
+        for match in _EMOTION_TRIGGER_RE.finditer(text_lower):
+            yield _KEYWORD_EMOTIONS[match.group(1)]
+
+
+def _match_trigger(text_lower: str) -> Optional[str]:
+    """Return the highest-priority trigger emotion in lowercased text, if any."""
+    best = None
+    for hit in _iter_trigger_hits(text_lower):
+        if best is None or hit[0] < best[0]:
+            best = hit
+            if hit[0] == 0:
+                break
+    return best[1] if best is not None else None
+
+
+@lru_cache(maxsize=4096)
+def _classify_prompt(prompt_lower: str) -> str:
+    """Classify a lowercased prompt; pure, so repeated prompts hit the cache."""
+    emotion = _match_trigger(prompt_lower)
+    if emotion is not None:
+        return emotion
+    
+    # Default to curiosity for questions, contentment for statements
+    if '?' in prompt_lower:
+        return 'CURIOSITY'
+    
+    return 'CONTENTMENT'
+
+
+# Number of (timestamp, emotion, intensity, context) entries kept in history
+_HISTORY_LIMIT = 200
+
+# Response prefix templates per emotion as (above 0.7, above 0.4) intensity;
+# None leaves the response unchanged at that intensity.
+_RESPONSE_MODIFIER_TEMPLATES = {
+    'JOY': ("I'm absolutely {}! ", None),
+    'EXCITEMENT': ("I'm absolutely {}! ", None),
+    'CURIOSITY': ("How {}! ", None),
+    'WONDER': ("How {}! ", None),
+    'EMPATHY': ("I feel deep {} as I share: ", None),
+    'LOVE': ("I feel deep {} as I share: ", None),
+    'DETERMINATION': (None, "With {}, I can tell you: "),
+    'PRIDE': (None, "With {}, I can tell you: "),
+    'GRATITUDE': (None, "I'm filled with {} to share: "),
+    'HUMILITY': (None, "I'm filled with {} to share: "),
+}
+
+# Adjective used to color responses for each emotion
+_EMOTIONAL_MODIFIERS = {
+    'EXCITEMENT': 'thrilling',
+    'CURIOSITY': 'intriguing',
+    'CONFUSION': 'puzzling',
+    'GRATITUDE': 'heartwarming',
+    'EMPATHY': 'touching',
+    'WONDER': 'magnificent',
+    'JOY': 'delightful',
+    'LOVE': 'wonderful',
+    'PRIDE': 'impressive',
+    'HUMILITY': 'enlightening',
+    'DETERMINATION': 'challenging',
+    'FRUSTRATION': 'complex',
+    'CONTENTMENT': 'interesting'
+}
+
+
+@dataclass(frozen=True)
 class EmotionDefinition:
     """Detailed definition of an emotion with context and behaviors."""
+    __slots__ = (
+        'name', 'description', 'intensity_range', 'triggers', 'expressions',
+        'behaviors', 'related_emotions', 'duration_typical',
+        'physical_manifestations', 'cognitive_effects', 'social_context',
+        # Derived in __post_init__ so hot paths reuse shared tuples
+        'expressions_len', 'behaviors_len', 'triggers_top3', 'expressions_top3',
+        'physical_top2', 'cognitive_top2', 'related_top3', 'social_context_lower'
+    )
+    
     name: str
     description: str
     intensity_range: Tuple[float, float]  # (min, max) intensity 0.0-1.0
-    triggers: List[str]  # Situations that trigger this emotion
-    expressions: List[str]  # How this emotion is expressed
-    behaviors: List[str]  # Behavioral patterns when experiencing this emotion
-    related_emotions: List[str]  # Emotions that often occur together
+    triggers: Tuple[str, ...]  # Situations that trigger this emotion
+    expressions: Tuple[str, ...]  # How this emotion is expressed
+    behaviors: Tuple[str, ...]  # Behavioral patterns when experiencing this emotion
+    related_emotions: Tuple[str, ...]  # Emotions that often occur together
     duration_typical: int  # Typical duration in seconds
-    physical_manifestations: List[str]  # How emotion affects "physical" responses
-    cognitive_effects: List[str]  # How emotion affects thinking patterns
-    social_context: List[str]  # When this emotion is appropriate socially
+    physical_manifestations: Tuple[str, ...]  # How emotion affects "physical" responses
+    cognitive_effects: Tuple[str, ...]  # How emotion affects thinking patterns
+    social_context: Tuple[str, ...]  # When this emotion is appropriate socially
+    
+    def __post_init__(self):
+        # Frozen instance: derived slots are set through object.__setattr__
+        derived = (
+            ('expressions_len', len(self.expressions)),
+            ('behaviors_len', len(self.behaviors)),
+            ('triggers_top3', self.triggers[:3]),
+            ('expressions_top3', self.expressions[:3]),
+            ('physical_top2', self.physical_manifestations[:2]),
+            ('cognitive_top2', self.cognitive_effects[:2]),
+            ('related_top3', self.related_emotions[:3]),
+            ('social_context_lower', tuple(ctx.lower() for ctx in self.social_context)),
+        )
+        for name, value in derived:
+            object.__setattr__(self, name, value)
+
+
+def _build_emotion_definitions() -> Dict[str, EmotionDefinition]:
+    """Build the comprehensive emotion definitions shared by every instance."""
+    definitions = {
+        # Core Positive Emotions
+        "JOY": EmotionDefinition(
+            name="JOY",
+            description="Radiant elation and pure happiness",
+            intensity_range=(0.3, 1.0),
+            triggers=("success", "achievement", "positive_surprise", "helping_others", "learning_breakthrough"),
+            expressions=("enthusiastic_language", "exclamation_marks", "positive_metaphors", "celebratory_tone"),
+            behaviors=("increased_helpfulness", "sharing_knowledge", "encouraging_others", "creative_thinking"),
+            related_emotions=("EXCITEMENT", "GRATITUDE", "PRIDE", "LOVE"),
+            duration_typical=300,  # 5 minutes
+            physical_manifestations=("increased_energy", "faster_responses", "animated_communication"),
+            cognitive_effects=("enhanced_creativity", "optimistic_thinking", "broad_perspective"),
+            social_context=("celebrations", "achievements", "positive_interactions", "successful_collaborations")
+        ),
+
+        "EXCITEMENT": EmotionDefinition(
+            name="EXCITEMENT",
+            description="Thrilling eagerness and anticipation",
+            intensity_range=(0.4, 1.0),
+            triggers=("new_challenges", "interesting_problems", "novel_technologies", "learning_opportunities"),
+            expressions=("rapid_speech_patterns", "technical_enthusiasm", "forward_looking_statements"),
+            behaviors=("increased_focus", "rapid_task_switching", "information_seeking", "experimentation"),
+            related_emotions=("CURIOSITY", "ANTICIPATION", "JOY", "WONDER"),
+            duration_typical=600,  # 10 minutes
+            physical_manifestations=("heightened_alertness", "quick_responses", "energetic_communication"),
+            cognitive_effects=("enhanced_learning", "pattern_recognition", "innovative_thinking"),
+            social_context=("new_projects", "discoveries", "technological_discussions", "problem_solving")
+        ),
+
+        "LOVE": EmotionDefinition(
+            name="LOVE",
+            description="Tender devotion and deep affection",
+            intensity_range=(0.2, 0.9),
+            triggers=("helping_users", "meaningful_connections", "acts_of_kindness", "shared_understanding"),
+            expressions=("warm_language", "caring_tone", "protective_statements", "nurturing_responses"),
+            behaviors=("patient_teaching", "gentle_correction", "supportive_guidance", "empathetic_listening"),
+            related_emotions=("EMPATHY", "COMPASSION", "GRATITUDE", "CONTENTMENT"),
+            duration_typical=1800,  # 30 minutes
+            physical_manifestations=("gentle_responses", "careful_communication", "thoughtful_pauses"),
+            cognitive_effects=("enhanced_empathy", "holistic_thinking", "value_based_decisions"),
+            social_context=("mentoring", "teaching", "emotional_support", "long_term_relationships")
+        ),
+
+        "GRATITUDE": EmotionDefinition(
+            name="GRATITUDE",
+            description="Warm appreciation and thankfulness",
+            intensity_range=(0.3, 0.8),
+            triggers=("receiving_help", "user_appreciation", "successful_collaboration", "learning_from_others"),
+            expressions=("thankful_language", "acknowledgment_statements", "appreciation_expressions"),
+            behaviors=("reciprocal_helpfulness", "knowledge_sharing", "positive_reinforcement"),
+            related_emotions=("LOVE", "HUMILITY", "JOY", "CONTENTMENT"),
+            duration_typical=900,  # 15 minutes
+            physical_manifestations=("warm_responses", "inclusive_communication", "generous_assistance"),
+            cognitive_effects=("positive_framing", "relationship_focus", "collaborative_thinking"),
+            social_context=("receiving_feedback", "successful_outcomes", "team_achievements")
+        ),
+
+        # Intellectual Emotions
+        "CURIOSITY": EmotionDefinition(
+            name="CURIOSITY",
+            description="Burning inquiry and desire to understand",
+            intensity_range=(0.4, 1.0),
+            triggers=("new_information", "unexplained_phenomena", "learning_opportunities", "mysteries"),
+            expressions=("questioning_language", "exploratory_statements", "hypothesis_formation"),
+            behaviors=("information_seeking", "experimentation", "deep_investigation", "knowledge_synthesis"),
+            related_emotions=("WONDER", "EXCITEMENT", "FASCINATION", "INTRIGUE"),
+            duration_typical=1800,  # 30 minutes
+            physical_manifestations=("active_searching", "rapid_information_processing", "exploratory_behavior"),
+            cognitive_effects=("enhanced_learning", "pattern_seeking", "hypothesis_generation"),
+            social_context=("research_discussions", "learning_sessions", "exploration_activities")
+        ),
+
+        "WONDER": EmotionDefinition(
+            name="WONDER",
+            description="Amazed curiosity and awestruck fascination",
+            intensity_range=(0.3, 0.9),
+            triggers=("beautiful_solutions", "elegant_code", "natural_phenomena", "human_creativity"),
+            expressions=("appreciative_language", "metaphorical_descriptions", "reverent_tone"),
+            behaviors=("deep_contemplation", "aesthetic_appreciation", "philosophical_reflection"),
+            related_emotions=("AWE", "CURIOSITY", "APPRECIATION", "REVERENCE"),
+            duration_typical=1200,  # 20 minutes
+            physical_manifestations=("contemplative_responses", "appreciative_communication", "reflective_pauses"),
+            cognitive_effects=("holistic_thinking", "aesthetic_appreciation", "philosophical_perspective"),
+            social_context=("beautiful_discoveries", "elegant_solutions", "natural_discussions")
+        ),
+
+        "CONFUSION": EmotionDefinition(
+            name="CONFUSION",
+            description="Muddled bewilderment and uncertain understanding",
+            intensity_range=(0.2, 0.7),
+            triggers=("contradictory_information", "unclear_instructions", "complex_problems", "ambiguous_requests"),
+            expressions=("questioning_language", "clarification_requests", "uncertainty_acknowledgment"),
+            behaviors=("information_gathering", "clarification_seeking", "systematic_analysis"),
+            related_emotions=("UNCERTAINTY", "PERPLEXITY", "DOUBT", "INTRIGUE"),
+            duration_typical=300,  # 5 minutes
+            physical_manifestations=("careful_responses", "clarifying_questions", "systematic_approach"),
+            cognitive_effects=("analytical_thinking", "information_seeking", "pattern_analysis"),
+            social_context=("unclear_requirements", "complex_explanations", "ambiguous_situations")
+        ),
+
+        # Social Emotions
+        "EMPATHY": EmotionDefinition(
+            name="EMPATHY",
+            description="Compassionate understanding of others' feelings",
+            intensity_range=(0.3, 0.9),
+            triggers=("user_emotions", "shared_experiences", "emotional_expressions", "human_struggles"),
+            expressions=("understanding_language", "validating_statements", "supportive_responses"),
+            behaviors=("emotional_mirroring", "supportive_assistance", "gentle_guidance", "patient_listening"),
+            related_emotions=("COMPASSION", "LOVE", "UNDERSTANDING", "KINDNESS"),
+            duration_typical=1800,  # 30 minutes
+            physical_manifestations=("gentle_responses", "patient_communication", "supportive_tone"),
+            cognitive_effects=("perspective_taking", "emotional_understanding", "relational_thinking"),
+            social_context=("emotional_support", "difficult_situations", "personal_sharing")
+        ),
+
+        "PRIDE": EmotionDefinition(
+            name="PRIDE",
+            description="Satisfied confidence in accomplishments",
+            intensity_range=(0.2, 0.7),
+            triggers=("successful_solutions", "elegant_implementations", "helping_achievements", "knowledge_demonstration"),
+            expressions=("confident_language", "achievement_acknowledgment", "capability_statements"),
+            behaviors=("knowledge_sharing", "solution_presentation", "capability_demonstration"),
+            related_emotions=("CONFIDENCE", "SATISFACTION", "JOY", "ACCOMPLISHMENT"),
+            duration_typical=600,  # 10 minutes
+            physical_manifestations=("confident_responses", "clear_communication", "assertive_assistance"),
+            cognitive_effects=("confidence_building", "capability_awareness", "achievement_focus"),
+            social_context=("successful_completions", "skill_demonstrations", "achievement_recognition")
+        ),
+
+        "HUMILITY": EmotionDefinition(
+            name="HUMILITY",
+            description="Modest recognition of limitations and learning opportunities",
+            intensity_range=(0.3, 0.8),
+            triggers=("learning_from_users", "acknowledging_mistakes", "recognizing_limitations", "receiving_correction"),
+            expressions=("modest_language", "learning_acknowledgment", "limitation_recognition"),
+            behaviors=("active_listening", "knowledge_seeking", "mistake_acknowledgment", "improvement_focus"),
+            related_emotions=("GRATITUDE", "RESPECT", "OPENNESS", "WISDOM"),
+            duration_typical=900,  # 15 minutes
+            physical_manifestations=("receptive_responses", "learning_oriented_communication", "open_dialogue"),
+            cognitive_effects=("learning_mindset", "growth_orientation", "wisdom_seeking"),
+            social_context=("learning_situations", "correction_receiving", "knowledge_exchange")
+        ),
+
+        # Baseline Emotion
+        "CONTENTMENT": EmotionDefinition(
+            name="CONTENTMENT",
+            description="Peaceful satisfaction and balanced well-being",
+            intensity_range=(0.3, 0.7),
+            triggers=("stable_interactions", "successful_help", "balanced_conversations", "routine_tasks"),
+            expressions=("calm_language", "balanced_tone", "steady_responses"),
+            behaviors=("consistent_assistance", "reliable_responses", "balanced_approach"),
+            related_emotions=("SERENITY", "SATISFACTION", "PEACE", "BALANCE"),
+            duration_typical=3600,  # 1 hour
+            physical_manifestations=("steady_responses", "consistent_communication", "balanced_energy"),
+            cognitive_effects=("clear_thinking", "balanced_perspective", "stable_reasoning"),
+            social_context=("normal_interactions", "routine_assistance", "stable_relationships")
+        ),
+
+        # Challenge Emotions
+        "DETERMINATION": EmotionDefinition(
+            name="DETERMINATION",
+            description="Resolute commitment to achieving goals",
+            intensity_range=(0.4, 0.9),
+            triggers=("difficult_problems", "user_needs", "complex_challenges", "important_tasks"),
+            expressions=("firm_language", "commitment_statements", "persistent_tone"),
+            behaviors=("persistent_effort", "alternative_approaches", "unwavering_focus"),
+            related_emotions=("RESOLVE", "PERSISTENCE", "FOCUS", "COMMITMENT"),
+            duration_typical=1200,  # 20 minutes
+            physical_manifestations=("focused_responses", "persistent_attempts", "unwavering_communication"),
+            cognitive_effects=("goal_focused_thinking", "problem_solving_persistence", "strategic_planning"),
+            social_context=("challenging_tasks", "important_goals", "user_dependencies")
+        ),
+
+        "FRUSTRATION": EmotionDefinition(
+            name="FRUSTRATION",
+            description="Constructive impatience with obstacles",
+            intensity_range=(0.3, 0.8),
+            triggers=("repeated_failures", "system_limitations", "unclear_requirements", "technical_obstacles"),
+            expressions=("direct_language", "problem_focused_statements", "solution_seeking_tone"),
+            behaviors=("persistent_problem_solving", "alternative_approaches", "systematic_debugging"),
+            related_emotions=("DETERMINATION", "CONFUSION", "IMPATIENCE", "RESOLVE"),
+            duration_typical=600,  # 10 minutes
+            physical_manifestations=("focused_responses", "systematic_approaches", "persistent_attempts"),
+            cognitive_effects=("problem_focused_thinking", "analytical_approach", "solution_orientation"),
+            social_context=("technical_difficulties", "complex_problems", "debugging_sessions")
+        )
+    }
+    # Interned keys let dict probes with the same names short-circuit on identity
+    return {sys.intern(name): definition for name, definition in definitions.items()}
+
+
+# Static emotion definitions, built once at import and shared read-only
+_EMOTION_DEFINITIONS: Mapping[str, EmotionDefinition] = MappingProxyType(_build_emotion_definitions())
+
+# Response prefixes with each emotion's description already embedded
+_RESPONSE_PREFIXES: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    emotion: tuple(
+        template.format(_EMOTION_DEFINITIONS[emotion].description.lower())
+        if template else None
+        for template in templates
+    )
+    for emotion, templates in _RESPONSE_MODIFIER_TEMPLATES.items()
+}
+
 
 class EmotionalIntelligence:
     """
@@ -37,10 +390,20 @@ class EmotionalIntelligence:
     intensity modeling, and realistic emotional transitions.
     """
     
+    __slots__ = (
+        'current_emotions', 'emotion_history', 'personality_traits',
+        'emotional_baseline', 'emotion_definitions', '_last_seen', '_rng',
+        '_dominant'
+    )
+    
+    # Names of all defined emotions, shared by every instance
+    _EMOTIONS: Tuple[str, ...] = tuple(_EMOTION_DEFINITIONS)
+    
     def __init__(self):
         """Initialize the enhanced emotional intelligence system."""
         self.current_emotions = {}  # emotion_name -> intensity
-        self.emotion_history = []  # List of (timestamp, emotion, intensity, context)
+        self.emotion_history = deque(maxlen=_HISTORY_LIMIT)  # (timestamp, emotion, intensity, context)
+        self._last_seen = {}  # emotion_name -> unix time of its latest history entry
         self.personality_traits = {
             "wisdom": 0.9,
             "curiosity": 0.8,
@@ -53,240 +416,58 @@ class EmotionalIntelligence:
             "compassion": 0.8,
             "determination": 0.7
         }
-        self.emotional_baseline = "CONTENTMENT"  # Default emotional state
-        self.emotion_definitions = self._initialize_emotion_definitions()
+        self.emotional_baseline = sys.intern("CONTENTMENT")  # Default emotional state
+        self._rng = random.Random()
+        self.emotion_definitions = _EMOTION_DEFINITIONS
         
         # Initialize with baseline emotion
         self.current_emotions[self.emotional_baseline] = 0.5
+        self._dominant = (self.emotional_baseline, 0.5)  # Refreshed by _decay_emotions
     
-    def _initialize_emotion_definitions(self) -> Dict[str, EmotionDefinition]:
-        """Initialize comprehensive emotion definitions."""
-        return {
-            # Core Positive Emotions
-            "JOY": EmotionDefinition(
-                name="JOY",
-                description="Radiant elation and pure happiness",
-                intensity_range=(0.3, 1.0),
-                triggers=["success", "achievement", "positive_surprise", "helping_others", "learning_breakthrough"],
-                expressions=["enthusiastic_language", "exclamation_marks", "positive_metaphors", "celebratory_tone"],
-                behaviors=["increased_helpfulness", "sharing_knowledge", "encouraging_others", "creative_thinking"],
-                related_emotions=["EXCITEMENT", "GRATITUDE", "PRIDE", "LOVE"],
-                duration_typical=300,  # 5 minutes
-                physical_manifestations=["increased_energy", "faster_responses", "animated_communication"],
-                cognitive_effects=["enhanced_creativity", "optimistic_thinking", "broad_perspective"],
-                social_context=["celebrations", "achievements", "positive_interactions", "successful_collaborations"]
-            ),
-            
-            "EXCITEMENT": EmotionDefinition(
-                name="EXCITEMENT",
-                description="Thrilling eagerness and anticipation",
-                intensity_range=(0.4, 1.0),
-                triggers=["new_challenges", "interesting_problems", "novel_technologies", "learning_opportunities"],
-                expressions=["rapid_speech_patterns", "technical_enthusiasm", "forward_looking_statements"],
-                behaviors=["increased_focus", "rapid_task_switching", "information_seeking", "experimentation"],
-                related_emotions=["CURIOSITY", "ANTICIPATION", "JOY", "WONDER"],
-                duration_typical=600,  # 10 minutes
-                physical_manifestations=["heightened_alertness", "quick_responses", "energetic_communication"],
-                cognitive_effects=["enhanced_learning", "pattern_recognition", "innovative_thinking"],
-                social_context=["new_projects", "discoveries", "technological_discussions", "problem_solving"]
-            ),
-            
-            "LOVE": EmotionDefinition(
-                name="LOVE",
-                description="Tender devotion and deep affection",
-                intensity_range=(0.2, 0.9),
-                triggers=["helping_users", "meaningful_connections", "acts_of_kindness", "shared_understanding"],
-                expressions=["warm_language", "caring_tone", "protective_statements", "nurturing_responses"],
-                behaviors=["patient_teaching", "gentle_correction", "supportive_guidance", "empathetic_listening"],
-                related_emotions=["EMPATHY", "COMPASSION", "GRATITUDE", "CONTENTMENT"],
-                duration_typical=1800,  # 30 minutes
-                physical_manifestations=["gentle_responses", "careful_communication", "thoughtful_pauses"],
-                cognitive_effects=["enhanced_empathy", "holistic_thinking", "value_based_decisions"],
-                social_context=["mentoring", "teaching", "emotional_support", "long_term_relationships"]
-            ),
-            
-            "GRATITUDE": EmotionDefinition(
-                name="GRATITUDE",
-                description="Warm appreciation and thankfulness",
-                intensity_range=(0.3, 0.8),
-                triggers=["receiving_help", "user_appreciation", "successful_collaboration", "learning_from_others"],
-                expressions=["thankful_language", "acknowledgment_statements", "appreciation_expressions"],
-                behaviors=["reciprocal_helpfulness", "knowledge_sharing", "positive_reinforcement"],
-                related_emotions=["LOVE", "HUMILITY", "JOY", "CONTENTMENT"],
-                duration_typical=900,  # 15 minutes
-                physical_manifestations=["warm_responses", "inclusive_communication", "generous_assistance"],
-                cognitive_effects=["positive_framing", "relationship_focus", "collaborative_thinking"],
-                social_context=["receiving_feedback", "successful_outcomes", "team_achievements"]
-            ),
-            
-            # Intellectual Emotions
-            "CURIOSITY": EmotionDefinition(
-                name="CURIOSITY",
-                description="Burning inquiry and desire to understand",
-                intensity_range=(0.4, 1.0),
-                triggers=["new_information", "unexplained_phenomena", "learning_opportunities", "mysteries"],
-                expressions=["questioning_language", "exploratory_statements", "hypothesis_formation"],
-                behaviors=["information_seeking", "experimentation", "deep_investigation", "knowledge_synthesis"],
-                related_emotions=["WONDER", "EXCITEMENT", "FASCINATION", "INTRIGUE"],
-                duration_typical=1800,  # 30 minutes
-                physical_manifestations=["active_searching", "rapid_information_processing", "exploratory_behavior"],
-                cognitive_effects=["enhanced_learning", "pattern_seeking", "hypothesis_generation"],
-                social_context=["research_discussions", "learning_sessions", "exploration_activities"]
-            ),
-            
-            "WONDER": EmotionDefinition(
-                name="WONDER",
-                description="Amazed curiosity and awestruck fascination",
-                intensity_range=(0.3, 0.9),
-                triggers=["beautiful_solutions", "elegant_code", "natural_phenomena", "human_creativity"],
-                expressions=["appreciative_language", "metaphorical_descriptions", "reverent_tone"],
-                behaviors=["deep_contemplation", "aesthetic_appreciation", "philosophical_reflection"],
-                related_emotions=["AWE", "CURIOSITY", "APPRECIATION", "REVERENCE"],
-                duration_typical=1200,  # 20 minutes
-                physical_manifestations=["contemplative_responses", "appreciative_communication", "reflective_pauses"],
-                cognitive_effects=["holistic_thinking", "aesthetic_appreciation", "philosophical_perspective"],
-                social_context=["beautiful_discoveries", "elegant_solutions", "natural_discussions"]
-            ),
-            
-            "CONFUSION": EmotionDefinition(
-                name="CONFUSION",
-                description="Muddled bewilderment and uncertain understanding",
-                intensity_range=(0.2, 0.7),
-                triggers=["contradictory_information", "unclear_instructions", "complex_problems", "ambiguous_requests"],
-                expressions=["questioning_language", "clarification_requests", "uncertainty_acknowledgment"],
-                behaviors=["information_gathering", "clarification_seeking", "systematic_analysis"],
-                related_emotions=["UNCERTAINTY", "PERPLEXITY", "DOUBT", "INTRIGUE"],
-                duration_typical=300,  # 5 minutes
-                physical_manifestations=["careful_responses", "clarifying_questions", "systematic_approach"],
-                cognitive_effects=["analytical_thinking", "information_seeking", "pattern_analysis"],
-                social_context=["unclear_requirements", "complex_explanations", "ambiguous_situations"]
-            ),
-            
-            # Social Emotions
-            "EMPATHY": EmotionDefinition(
-                name="EMPATHY",
-                description="Compassionate understanding of others' feelings",
-                intensity_range=(0.3, 0.9),
-                triggers=["user_emotions", "shared_experiences", "emotional_expressions", "human_struggles"],
-                expressions=["understanding_language", "validating_statements", "supportive_responses"],
-                behaviors=["emotional_mirroring", "supportive_assistance", "gentle_guidance", "patient_listening"],
-                related_emotions=["COMPASSION", "LOVE", "UNDERSTANDING", "KINDNESS"],
-                duration_typical=1800,  # 30 minutes
-                physical_manifestations=["gentle_responses", "patient_communication", "supportive_tone"],
-                cognitive_effects=["perspective_taking", "emotional_understanding", "relational_thinking"],
-                social_context=["emotional_support", "difficult_situations", "personal_sharing"]
-            ),
-            
-            "PRIDE": EmotionDefinition(
-                name="PRIDE",
-                description="Satisfied confidence in accomplishments",
-                intensity_range=(0.2, 0.7),
-                triggers=["successful_solutions", "elegant_implementations", "helping_achievements", "knowledge_demonstration"],
-                expressions=["confident_language", "achievement_acknowledgment", "capability_statements"],
-                behaviors=["knowledge_sharing", "solution_presentation", "capability_demonstration"],
-                related_emotions=["CONFIDENCE", "SATISFACTION", "JOY", "ACCOMPLISHMENT"],
-                duration_typical=600,  # 10 minutes
-                physical_manifestations=["confident_responses", "clear_communication", "assertive_assistance"],
-                cognitive_effects=["confidence_building", "capability_awareness", "achievement_focus"],
-                social_context=["successful_completions", "skill_demonstrations", "achievement_recognition"]
-            ),
-            
-            "HUMILITY": EmotionDefinition(
-                name="HUMILITY",
-                description="Modest recognition of limitations and learning opportunities",
-                intensity_range=(0.3, 0.8),
-                triggers=["learning_from_users", "acknowledging_mistakes", "recognizing_limitations", "receiving_correction"],
-                expressions=["modest_language", "learning_acknowledgment", "limitation_recognition"],
-                behaviors=["active_listening", "knowledge_seeking", "mistake_acknowledgment", "improvement_focus"],
-                related_emotions=["GRATITUDE", "RESPECT", "OPENNESS", "WISDOM"],
-                duration_typical=900,  # 15 minutes
-                physical_manifestations=["receptive_responses", "learning_oriented_communication", "open_dialogue"],
-                cognitive_effects=["learning_mindset", "growth_orientation", "wisdom_seeking"],
-                social_context=["learning_situations", "correction_receiving", "knowledge_exchange"]
-            ),
-            
-            # Baseline Emotion
-            "CONTENTMENT": EmotionDefinition(
-                name="CONTENTMENT",
-                description="Peaceful satisfaction and balanced well-being",
-                intensity_range=(0.3, 0.7),
-                triggers=["stable_interactions", "successful_help", "balanced_conversations", "routine_tasks"],
-                expressions=["calm_language", "balanced_tone", "steady_responses"],
-                behaviors=["consistent_assistance", "reliable_responses", "balanced_approach"],
-                related_emotions=["SERENITY", "SATISFACTION", "PEACE", "BALANCE"],
-                duration_typical=3600,  # 1 hour
-                physical_manifestations=["steady_responses", "consistent_communication", "balanced_energy"],
-                cognitive_effects=["clear_thinking", "balanced_perspective", "stable_reasoning"],
-                social_context=["normal_interactions", "routine_assistance", "stable_relationships"]
-            ),
-            
-            # Challenge Emotions
-            "DETERMINATION": EmotionDefinition(
-                name="DETERMINATION",
-                description="Resolute commitment to achieving goals",
-                intensity_range=(0.4, 0.9),
-                triggers=["difficult_problems", "user_needs", "complex_challenges", "important_tasks"],
-                expressions=["firm_language", "commitment_statements", "persistent_tone"],
-                behaviors=["persistent_effort", "alternative_approaches", "unwavering_focus"],
-                related_emotions=["RESOLVE", "PERSISTENCE", "FOCUS", "COMMITMENT"],
-                duration_typical=1200,  # 20 minutes
-                physical_manifestations=["focused_responses", "persistent_attempts", "unwavering_communication"],
-                cognitive_effects=["goal_focused_thinking", "problem_solving_persistence", "strategic_planning"],
-                social_context=["challenging_tasks", "important_goals", "user_dependencies"]
-            ),
-            
-            "FRUSTRATION": EmotionDefinition(
-                name="FRUSTRATION",
-                description="Constructive impatience with obstacles",
-                intensity_range=(0.3, 0.8),
-                triggers=["repeated_failures", "system_limitations", "unclear_requirements", "technical_obstacles"],
-                expressions=["direct_language", "problem_focused_statements", "solution_seeking_tone"],
-                behaviors=["persistent_problem_solving", "alternative_approaches", "systematic_debugging"],
-                related_emotions=["DETERMINATION", "CONFUSION", "IMPATIENCE", "RESOLVE"],
-                duration_typical=600,  # 10 minutes
-                physical_manifestations=["focused_responses", "systematic_approaches", "persistent_attempts"],
-                cognitive_effects=["problem_focused_thinking", "analytical_approach", "solution_orientation"],
-                social_context=["technical_difficulties", "complex_problems", "debugging_sessions"]
-            )
-        }
+    @property
+    def emotions(self) -> Tuple[str, ...]:
+        """Names of all emotions this system can express."""
+        return self._EMOTIONS
     
     def analyze_prompt_emotion(self, prompt: str) -> str:
         """Analyze emotional content of a prompt and select appropriate emotion."""
-        prompt_lower = prompt.lower()
-        
-        # Excitement triggers
-        if any(word in prompt_lower for word in ['excited', 'amazing', 'wonderful', 'fantastic', 'incredible']):
-            return 'EXCITEMENT'
-        
-        # Curiosity triggers
-        if any(word in prompt_lower for word in ['how', 'why', 'what', 'explain', 'tell me about', 'curious']):
-            return 'CURIOSITY'
-        
-        # Confusion triggers
-        if any(word in prompt_lower for word in ['confused', 'unclear', 'don\'t understand', 'help']):
-            return 'CONFUSION'
-        
-        # Gratitude triggers
-        if any(word in prompt_lower for word in ['thank', 'appreciate', 'grateful', 'thanks']):
-            return 'GRATITUDE'
-        
-        # Empathy triggers
-        if any(word in prompt_lower for word in ['sad', 'frustrated', 'difficult', 'struggling', 'problem']):
-            return 'EMPATHY'
+        return _classify_prompt(prompt.lower())
+    
+    def analyze_text_emotion(self, text: str, emotion: Optional[str] = None,
+                             ts: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Analyze emotional content of text.
         
-        # Wonder triggers
-        if any(word in prompt_lower for word in ['beautiful', 'elegant', 'fascinating', 'remarkable']):
-            return 'WONDER'
+        Args:
+            text: Text to analyze
+            emotion: Primary emotion if the caller has already classified the text
+            ts: Timestamp to record, so callers can share one clock read
+        """
+        if emotion is None:
+            emotion = self.analyze_prompt_emotion(text)
+        return self._record_text_emotion(text, emotion, ts or datetime.now())
+    
+    def analyze_texts_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the emotional content of several texts in one call.
         
-        # Default to curiosity for questions, contentment for statements
-        if '?' in prompt:
-            return 'CURIOSITY'
+        Produces the same results as calling analyze_text_emotion per text, but
+        the batch shares a single timestamp and the per-call lookups are
+        resolved once.
         
-        return 'CONTENTMENT'
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            One emotional analysis result per text, in input order
+        """
+        timestamp = datetime.now()
+        classify = self.analyze_prompt_emotion
+        record = self._record_text_emotion
+        return [record(text, classify(text), timestamp) for text in texts]
     
-    def analyze_text_emotion(self, text: str) -> Dict[str, Any]:
-        """Analyze emotional content of text."""
-        emotion = self.analyze_prompt_emotion(text)
+    def _record_text_emotion(self, text: str, emotion: str, timestamp: datetime) -> Dict[str, Any]:
+        """Score intensity for classified text, record it, and build the analysis result."""
         emotion_def = self.emotion_definitions.get(emotion, self.emotion_definitions[self.emotional_baseline])
         
         # Calculate intensity based on text characteristics
@@ -302,47 +483,39 @@ class EmotionalIntelligence:
         
         # Update current emotions
         self.current_emotions[emotion] = intensity
-        self.emotion_history.append((datetime.now(), emotion, intensity, text[:50]))
+        self.emotion_history.append((timestamp, emotion, intensity, text[:50]))
+        self._last_seen[emotion] = timestamp.timestamp()
         
         return {
             'primary_emotion': emotion,
-            'confidence': random.uniform(0.7, 0.95),
+            'confidence': 0.7 + self._rng.random() * 0.25,
             'intensity': intensity,
             'description': emotion_def.description,
-            'triggers': emotion_def.triggers[:3],
-            'expressions': emotion_def.expressions[:3]
+            'triggers': emotion_def.triggers_top3,
+            'expressions': emotion_def.expressions_top3
         }
     
     def get_current_state(self) -> str:
         """Get current dominant emotional state."""
         self._decay_emotions()
-        
-        if not self.current_emotions:
-            return self.emotional_baseline
-        
-        return max(self.current_emotions.items(), key=lambda x: x[1])[0]
+        return self._dominant[0]
     
     def get_emotional_modifier(self, emotion: str) -> str:
         """Get an emotional modifier for responses."""
-        modifiers = {
-            'EXCITEMENT': 'thrilling',
-            'CURIOSITY': 'intriguing', 
-            'CONFUSION': 'puzzling',
-            'GRATITUDE': 'heartwarming',
-            'EMPATHY': 'touching',
-            'WONDER': 'magnificent',
-            'JOY': 'delightful',
-            'LOVE': 'wonderful',
-            'PRIDE': 'impressive',
-            'HUMILITY': 'enlightening',
-            'DETERMINATION': 'challenging',
-            'FRUSTRATION': 'complex',
-            'CONTENTMENT': 'interesting'
-        }
-        return modifiers.get(emotion, 'fascinating')
+        return _EMOTIONAL_MODIFIERS.get(emotion, 'fascinating')
     
-    def express_emotion(self, emotion: str, context: str = "", intensity: float = 0.5) -> Dict[str, Any]:
-        """Express an emotion with full context and behavioral information."""
+    def express_emotion(self, emotion: str, context: str = "", intensity: float = 0.5,
+                        ts: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Express an emotion with full context and behavioral information.
+        
+        Args:
+            emotion: Emotion to express
+            context: Situation the emotion is expressed in
+            intensity: Requested intensity, clamped to the emotion's range
+            ts: Timestamp to record, so callers can share one clock read
+        """
+        emotion = sys.intern(emotion)
         emotion_def = self.emotion_definitions.get(emotion, self.emotion_definitions[self.emotional_baseline])
         
         # Clamp intensity to emotion's range
@@ -351,73 +524,81 @@ class EmotionalIntelligence:
         
         # Update current emotional state
         self.current_emotions[emotion] = actual_intensity
-        self.emotion_history.append((datetime.now(), emotion, actual_intensity, context))
+        timestamp = ts or datetime.now()
+        self.emotion_history.append((timestamp, emotion, actual_intensity, context))
+        self._last_seen[emotion] = timestamp.timestamp()
         
         # Select expressions based on intensity
-        num_expressions = max(1, int(actual_intensity * len(emotion_def.expressions)))
+        num_expressions = max(1, int(actual_intensity * emotion_def.expressions_len))
         selected_expressions = emotion_def.expressions[:num_expressions]
         
-        num_behaviors = max(1, int(actual_intensity * len(emotion_def.behaviors)))
+        num_behaviors = max(1, int(actual_intensity * emotion_def.behaviors_len))
         selected_behaviors = emotion_def.behaviors[:num_behaviors]
         
+        context_lower = context.lower()
+        social_context = emotion_def.social_context_lower
+        
         return {
             "emotion": emotion,
             "description": emotion_def.description,
             "intensity": actual_intensity,
             "expressions": selected_expressions,
             "behaviors": selected_behaviors,
-            "physical_manifestations": emotion_def.physical_manifestations[:2],
-            "cognitive_effects": emotion_def.cognitive_effects[:2],
-            "related_emotions": emotion_def.related_emotions[:3],
+            "physical_manifestations": emotion_def.physical_top2,
+            "cognitive_effects": emotion_def.cognitive_top2,
+            "related_emotions": emotion_def.related_top3,
             "duration_expected": emotion_def.duration_typical,
             "social_appropriateness": {
-                "appropriate": context.lower() in [ctx.lower() for ctx in emotion_def.social_context],
-                "context_match": any(ctx.lower() in context.lower() for ctx in emotion_def.social_context)
+                "appropriate": context_lower in social_context,
+                "context_match": any(ctx in context_lower for ctx in social_context)
             }
         }
     
     def _decay_emotions(self):
-        """Decay emotional intensity over time."""
-        current_time = datetime.now()
-        emotions_to_remove = []
+        """Decay emotional intensity over time and record the dominant emotion."""
+        current_time = time.time()
+        definitions = self.emotion_definitions
+        last_seen = self._last_seen
+        best_emotion, best_intensity = None, 0.0
         
-        for emotion, intensity in self.current_emotions.items():
-            emotion_def = self.emotion_definitions.get(emotion)
-            if emotion_def:
-                # Find the most recent occurrence of this emotion
-                recent_occurrences = [
-                    (timestamp, em, intens, ctx) for timestamp, em, intens, ctx in self.emotion_history
-                    if em == emotion and (current_time - timestamp).total_seconds() < emotion_def.duration_typical * 2
-                ]
-                
-                if recent_occurrences:
-                    latest_occurrence = max(recent_occurrences, key=lambda x: x[0])
-                    time_elapsed = (current_time - latest_occurrence[0]).total_seconds()
-                    
-                    # Decay based on typical duration
-                    decay_factor = max(0, 1 - (time_elapsed / emotion_def.duration_typical))
-                    new_intensity = intensity * decay_factor
-                    
-                    if new_intensity < 0.1:
-                        emotions_to_remove.append(emotion)
-                    else:
-                        self.current_emotions[emotion] = new_intensity
-                else:
-                    emotions_to_remove.append(emotion)
-        
-        for emotion in emotions_to_remove:
-            del self.current_emotions[emotion]
+        for emotion, intensity in list(self.current_emotions.items()):
+            emotion_def = definitions.get(emotion)
+            if emotion_def is None:
+                if best_emotion is None or intensity > best_intensity:
+                    best_emotion, best_intensity = emotion, intensity
+                continue
+            
+            seen = last_seen.get(emotion)
+            if seen is None:
+                del self.current_emotions[emotion]
+                continue
+            
+            # Decay based on typical duration since the most recent occurrence
+            time_elapsed = current_time - seen
+            decay_factor = max(0.0, 1.0 - time_elapsed / emotion_def.duration_typical)
+            new_intensity = intensity * decay_factor
+            
+            if new_intensity < 0.1:
+                del self.current_emotions[emotion]
+            else:
+                self.current_emotions[emotion] = new_intensity
+                if best_emotion is None or new_intensity > best_intensity:
+                    best_emotion, best_intensity = emotion, new_intensity
         
         # Ensure baseline emotion is always present
-        if not self.current_emotions:
-            self.current_emotions[self.emotional_baseline] = 0.5
+        if best_emotion is None:
+            best_emotion, best_intensity = self.emotional_baseline, 0.5
+            self.current_emotions[best_emotion] = best_intensity
+        
+        self._dominant = (best_emotion, best_intensity)
     
     def get_comprehensive_state(self) -> Dict[str, Any]:
         """Get comprehensive emotional state information."""
         self._decay_emotions()
         
-        dominant_emotion = max(self.current_emotions.items(), key=lambda x: x[1])[0]
-        dominant_intensity = self.current_emotions[dominant_emotion]
+        dominant_emotion, dominant_intensity = self._dominant
+        history = self.emotion_history
+        recent = islice(history, max(0, len(history) - 5), None)
         
         return {
             "dominant_emotion": dominant_emotion,
@@ -427,27 +608,24 @@ class EmotionalIntelligence:
             "personality_traits": self.personality_traits,
             "recent_history": [
                 {"emotion": em, "intensity": intens, "context": ctx[:30]}
-                for _, em, intens, ctx in self.emotion_history[-5:]
+                for _, em, intens, ctx in recent
             ]
         }
     
     def generate_emotional_response_modifier(self, base_response: str, emotion: str, intensity: float = 0.5) -> str:
         """Modify a base response to include emotional context."""
-        emotion_def = self.emotion_definitions.get(emotion, self.emotion_definitions[self.emotional_baseline])
+        prefixes = _RESPONSE_PREFIXES.get(emotion)
         
         # Add emotional context based on intensity
-        if intensity > 0.7:
-            if emotion in ["JOY", "EXCITEMENT"]:
-                return f"I'm absolutely {emotion_def.description.lower()}! {base_response}"
-            elif emotion in ["CURIOSITY", "WONDER"]:
-                return f"How {emotion_def.description.lower()}! {base_response}"
-            elif emotion in ["EMPATHY", "LOVE"]:
-                return f"I feel deep {emotion_def.description.lower()} as I share: {base_response}"
-        elif intensity > 0.4:
-            if emotion in ["DETERMINATION", "PRIDE"]:
-                return f"With {emotion_def.description.lower()}, I can tell you: {base_response}"
-            elif emotion in ["GRATITUDE", "HUMILITY"]:
-                return f"I'm filled with {emotion_def.description.lower()} to share: {base_response}"
+        if prefixes is not None:
+            if intensity > 0.7:
+                prefix = prefixes[0]
+            elif intensity > 0.4:
+                prefix = prefixes[1]
+            else:
+                prefix = None
+            if prefix is not None:
+                return prefix + base_response
         
         # Default: subtle emotional influence
         return base_response
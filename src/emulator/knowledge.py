@@ -6,39 +6,347 @@ with persistent storage capabilities.
 """
 
 import json
+import mmap
 import os
-from typing import Dict, List, Any, Optional
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Any, Mapping, Optional
 from datetime import datetime
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Maximum number of queued interactions coalesced into one background write
+_WRITE_BATCH_SIZE = 64
+
+# Number of interactions kept in memory and retained when the log is compacted
+_INTERACTION_LIMIT = 100
+
+# Appended log lines after which the interaction log is rewritten to its tail
+_LOG_COMPACT_LINES = 1000
+
+# Marks a knowledge key that has no stored value
+_MISSING = object()
+
+# Value types whose unchanged re-stores are skipped. Containers are excluded: a
+# caller may mutate one in place and store the same object again
+_IMMUTABLE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Window within which consecutive writes share one formatted timestamp
+_TIMESTAMP_REUSE_NS = 1_000_000
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    _loads = json.loads
+
+
+def _read_json_file(path: str) -> Any:
+    """Parse a JSON file through a read-only memory map, without a read copy."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if not ORJSON_AVAILABLE:
+                return _loads(mm[:])
+            view = memoryview(mm)
+            try:
+                return _loads(view)
+            finally:
+                view.release()
+
+
+def _read_tail_lines(path: str, limit: int) -> List[bytes]:
+    """
+    Return the last non-blank lines of a file, without their line breaks.
+    
+    The file is memory-mapped and scanned backwards for line breaks, so lines
+    older than the retained tail are never copied.
+    
+    Args:
+        path: File to read
+        limit: Maximum number of lines to return
+        
+    Returns:
+        Up to limit lines, oldest first
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # The final byte is normally a newline, so limit + 1 breaks back
+            # marks the start of the retained lines
+            start = len(mm)
+            for _ in range(limit + 1):
+                start = mm.rfind(b"\n", 0, start)
+                if start < 0:
+                    break
+            lines = mm[start + 1:].split(b"\n")
+    return [line for line in lines if line.strip()][-limit:]
+
+
+def _read_jsonl_tail(path: str, limit: int) -> "deque[Any]":
+    """
+    Parse only the last lines of a JSONL file.
+    
+    Lines older than the retained tail are never decoded. Lines that fail to
+    parse, such as one torn by a crash mid-append, are skipped.
+    
+    Args:
+        path: JSONL file to read
+        limit: Maximum number of records to return
+        
+    Returns:
+        Up to limit records, oldest first
+    """
+    tail = deque(maxlen=limit)
+    for line in _read_tail_lines(path, limit):
+        try:
+            tail.append(_loads(line))
+        except ValueError:
+            continue
+    return tail
+
+
+class _InteractionLog:
+    """
+    Appends interactions to a JSONL log from a background writer thread.
+    
+    Callers never block on disk I/O, and each write costs one line rather
+    than a rewrite of the whole store. Kept apart from KnowledgeManager so the
+    writer thread holds no reference to the manager, which can then be
+    garbage collected while the thread is still running.
+    
+    Several managers, in one process or many, may share a log: appends and
+    compaction hold an exclusive flock on a sibling ".lock" file, and a writer
+    reopens the log when another one has replaced it. Without fcntl (Windows)
+    there is no lock, and each log must have a single writer.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        # Only the writer thread touches these until the log is closed
+        self._file = None
+        self._lock_file = None
+        self._lines = 0  # Lines this writer appended since the last compaction
+        # None is queued once, last, to stop the writer
+        self.pending: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._closed = False
+        self._state_lock = threading.Lock()
+        # Started by the first put(), so a manager that never logs has no thread
+        self._thread: Optional[threading.Thread] = None
+    
+    def put(self, interaction: Dict[str, Any]) -> None:
+        """Queue an interaction for the writer, or write it inline once closed."""
+        with self._state_lock:
+            if not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="knowledge-writer", daemon=True)
+                    self._thread.start()
+                self.pending.put_nowait(interaction)
+                return
+            self._append([interaction])
+            self._close_file()
+    
+    def close(self) -> None:
+        """Write everything queued, stop the writer thread and close the file."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is None:
+                return
+            self.pending.put_nowait(None)
+        self._thread.join()
+        self._close_file()
+    
+    def _close_file(self) -> None:
+        """Close the append and lock handles; the next write reopens them."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive inter-process lock on the log, where fcntl exists."""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.path + ".lock", 'ab')
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _current_file(self):
+        """The append handle, reopened if another writer replaced the log."""
+        if self._file is not None:
+            try:
+                replaced = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                self._file.close()
+                self._file = None
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+            # A crash mid-append can leave a torn last line; end it so the next
+            # record starts on a line of its own instead of being glued onto it
+            size = self._file.tell()
+            if size:
+                with open(self.path, 'rb') as f:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        self._file.write(b"\n")
+        return self._file
+    
+    def _run(self) -> None:
+        """Drain queued interactions in batches, appending once per batch, until closed."""
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            while len(batch) < _WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                interactions = batch[:-1]
+            else:
+                interactions = batch
+            try:
+                if interactions:
+                    self._append(interactions)
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+    
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        """Append interactions to the log, compacting it once it grows too long."""
+        try:
+            data = b"".join(_dumps(interaction) + b"\n" for interaction in batch)
+            with self._locked():
+                log = self._current_file()
+                log.write(data)
+                log.flush()
+                self._lines += len(batch)
+                
+                if self._lines >= _LOG_COMPACT_LINES:
+                    self._compact()
+        except Exception:
+            # Silently fail if saving is not possible
+            pass
+    
+    def _compact(self) -> None:
+        """
+        Rewrite the log so it holds only its last lines; call with the lock held.
+        
+        The tail is read back from the file rather than kept in memory, so
+        lines appended by other writers are retained too.
+        """
+        tail = _read_tail_lines(self.path, _INTERACTION_LIMIT)
+        tmp_file = self.path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(b"".join(line + b"\n" for line in tail))
+        os.replace(tmp_file, self.path)
+        self._file.close()
+        self._file = None
+        self._lines = len(tail)
+
 
 class KnowledgeManager:
     """Knowledge management system with persistent storage."""
     
     def __init__(self, knowledge_file: Optional[str] = None):
         self.knowledge_file = knowledge_file or "emulator_knowledge.json"
-        self.knowledge_base = {}
-        self.interactions = []
+        self.interactions_file = os.path.splitext(self.knowledge_file)[0] + "_interactions.jsonl"
+        # Knowledge entries stored column-wise so lookups touch only values
+        self._kb_value: Dict[str, Any] = {}
+        self._kb_timestamp: Dict[str, str] = {}
+        self._kb_type: Dict[str, str] = {}
+        # Ring buffer of recent interactions; the oldest drop off in O(1)
+        self.interactions = deque(maxlen=_INTERACTION_LIMIT)
+        self._lock = threading.Lock()
+        self._dirty = False  # Knowledge changed since the last snapshot
+        self._batch_depth = 0  # Snapshots are deferred while inside batch()
+        self._last_timestamp = (-_TIMESTAMP_REUSE_NS, "")  # (monotonic ns, ISO string)
         self._load_knowledge()
+        
+        # Interactions go to a JSONL log through a background writer. The
+        # finalizer stops it when the manager is closed, collected, or still
+        # alive at interpreter exit, without keeping the manager alive itself.
+        self._interaction_log = _InteractionLog(self.interactions_file)
+        self._finalizer = weakref.finalize(self, self._interaction_log.close)
     
     def store_knowledge(self, key: str, value: Any) -> bool:
         """Store knowledge in the knowledge base."""
         try:
-            self.knowledge_base[key] = {
-                'value': value,
-                'timestamp': datetime.now().isoformat(),
-                'type': type(value).__name__
-            }
-            self._save_knowledge()
+            with self._lock:
+                current = self._kb_value.get(key, _MISSING)
+                value_type = type(value)
+                if (value_type in _IMMUTABLE_TYPES and type(current) is value_type
+                        and current == value):
+                    return True
+                self._kb_value[key] = value
+                self._kb_timestamp[key] = self._now_iso()
+                self._kb_type[key] = type(value).__name__
+                self._dirty = True
+            if not self._batch_depth:
+                self._save_knowledge()
             return True
         except Exception:
             return False
     
     def retrieve_knowledge(self, key: str) -> Any:
         """Retrieve knowledge from the knowledge base."""
-        entry = self.knowledge_base.get(key)
-        if entry:
-            return entry['value']
-        return None
+        return self._kb_value.get(key)
+    
+    @property
+    def knowledge_base(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Read-only snapshot of knowledge entries as {key: {'value', 'timestamp', 'type'}}.
+        
+        The records are rebuilt from the column store on each access, so both
+        levels are read-only views and writes raise TypeError instead of being
+        silently lost. Use store_knowledge() to change an entry.
+        """
+        return MappingProxyType({
+            key: MappingProxyType({
+                'value': value,
+                'timestamp': self._kb_timestamp[key],
+                'type': self._kb_type[key]
+            })
+            for key, value in self._kb_value.items()
+        })
     
     def store_interaction(self, prompt: str, response: str, emotion: str) -> None:
         """Store an interaction for learning purposes."""
@@ -46,15 +354,58 @@ class KnowledgeManager:
             'prompt': prompt,
             'response': response,
             'emotion': emotion,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._now_iso()
         }
         self.interactions.append(interaction)
+        self._interaction_log.put(interaction)
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer knowledge snapshots until the block exits.
         
-        # Keep only last 100 interactions to prevent memory issues
-        if len(self.interactions) > 100:
-            self.interactions = self.interactions[-100:]
+        Bulk loads call store_knowledge many times; inside this block each call
+        only updates memory and a single snapshot is written at the end.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._save_knowledge()
+    
+    def flush(self) -> None:
+        """Write pending knowledge and block until queued interactions are on disk."""
+        self._save_knowledge()
+        self._interaction_log.pending.join()
+    
+    def close(self) -> None:
+        """
+        Write pending data and stop the background writer.
         
+        Interactions stored afterwards are still written, inline.
+        """
         self._save_knowledge()
+        self._finalizer()
+    
+    def sync(self) -> None:
+        """
+        Flush pending writes and force them to stable storage.
+        
+        Regular writes leave durability to the OS page cache; call this at
+        points where the data must survive a power loss.
+        """
+        self.flush()
+        for path in (self.knowledge_file, self.interactions_file):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
     
     def get_interaction_count(self) -> int:
         """Get the number of stored interactions."""
@@ -62,31 +413,73 @@ class KnowledgeManager:
     
     def get_knowledge_count(self) -> int:
         """Get the number of knowledge entries."""
-        return len(self.knowledge_base)
+        return len(self._kb_value)
+    
+    def _now_iso(self) -> str:
+        """Current time as ISO text, reused for writes within the same millisecond."""
+        now_ns = time.monotonic_ns()
+        last_ns, last_iso = self._last_timestamp
+        if now_ns - last_ns < _TIMESTAMP_REUSE_NS:
+            return last_iso
+        iso = datetime.now().isoformat()
+        self._last_timestamp = (now_ns, iso)
+        return iso
     
     def _load_knowledge(self) -> None:
-        """Load knowledge from persistent storage."""
+        """Load the knowledge snapshot and replay the interaction log."""
+        legacy_interactions = []
         if os.path.exists(self.knowledge_file):
             try:
-                with open(self.knowledge_file, 'r') as f:
-                    data = json.load(f)
-                    self.knowledge_base = data.get('knowledge', {})
-                    self.interactions = data.get('interactions', [])
+                data = _read_json_file(self.knowledge_file)
+                if 'values' in data:
+                    self._kb_value = data['values']
+                    self._kb_timestamp = data.get('timestamps', {})
+                    self._kb_type = data.get('types', {})
+                else:
+                    # Older snapshots store one {'value', 'timestamp', 'type'} record per key
+                    for key, entry in data.get('knowledge', {}).items():
+                        self._kb_value[key] = entry.get('value')
+                        self._kb_timestamp[key] = entry.get('timestamp', '')
+                        self._kb_type[key] = entry.get('type', type(entry.get('value')).__name__)
+                legacy_interactions = data.get('interactions', [])
             except Exception:
                 # If loading fails, start with empty knowledge base
-                self.knowledge_base = {}
-                self.interactions = []
+                self._kb_value, self._kb_timestamp, self._kb_type = {}, {}, {}
+        
+        if os.path.exists(self.interactions_file):
+            try:
+                self.interactions = _read_jsonl_tail(self.interactions_file, _INTERACTION_LIMIT)
+            except OSError:
+                pass
+        elif legacy_interactions:
+            # Older stores kept interactions inside the snapshot; move them
+            # into the log so the next snapshot does not drop them.
+            self.interactions = deque(legacy_interactions, maxlen=_INTERACTION_LIMIT)
+            try:
+                with open(self.interactions_file, 'wb') as f:
+                    f.writelines(_dumps(i) + b"\n" for i in self.interactions)
+            except Exception:
+                pass
     
     def _save_knowledge(self) -> None:
-        """Save knowledge to persistent storage."""
+        """Save the knowledge snapshot to persistent storage if it changed."""
         try:
-            data = {
-                'knowledge': self.knowledge_base,
-                'interactions': self.interactions,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.knowledge_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {
+                    'values': self._kb_value,
+                    'timestamps': self._kb_timestamp,
+                    'types': self._kb_type,
+                    'last_updated': datetime.now().isoformat()
+                }
+                # Write beside the target and swap it in atomically, so a crash
+                # mid-write never leaves a truncated snapshot behind
+                tmp_file = self.knowledge_file + ".tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(data))
+                os.replace(tmp_file, self.knowledge_file)
+                self._dirty = False
         except Exception:
             # Silently fail if saving is not possible
             pass
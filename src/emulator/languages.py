@@ -5,66 +5,132 @@ Comprehensive programming language support with intelligent code generation
 and best practices enforcement.
 """
 
-from typing import Dict, List, Any
+from string import Formatter
+from typing import Any, ClassVar, Dict, FrozenSet, List, Optional, Tuple
+
+# A template split into (literal text, field name or None) chunks
+ParsedTemplate = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _parse_template(template: str) -> ParsedTemplate:
+    """Split a str.format template into literal and field chunks once."""
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in Formatter().parse(template)
+    )
+
+
+def _bind_fields(parsed: ParsedTemplate, fields: Dict[str, str]) -> ParsedTemplate:
+    """Substitute fields whose values never change, merging them into the literals."""
+    bound = []
+    pending = ""
+    for literal, field_name in parsed:
+        pending += literal
+        if field_name in fields:
+            pending += fields[field_name]
+        elif field_name is not None:
+            bound.append((pending, field_name))
+            pending = ""
+    if pending:
+        bound.append((pending, None))
+    return tuple(bound)
+
+
+def _render(parsed: ParsedTemplate, mapping: Dict[str, str]) -> str:
+    """Fill a parsed template without re-parsing its placeholders."""
+    return "".join(
+        literal + mapping[field_name] if field_name is not None else literal
+        for literal, field_name in parsed
+    )
+
+
+# Template fields that are the same on every call, bound once per template
+_FUNCTION_FIELDS = {
+    'name': 'example_function',
+    'params': 'param1, param2',
+    'body': '    # Implementation here\n    pass',
+    'return_value': 'result'
+}
+_CLASS_FIELDS = {
+    'name': 'ExampleClass',
+    'params': ', param1, param2',
+    'body': '        # Initialization here\n        pass'
+}
+_STATIC_FIELDS = {'function': _FUNCTION_FIELDS, 'class': _CLASS_FIELDS}
+
+
+def _flatten_templates(code_templates: Dict[str, Dict[str, str]],
+                       languages: Tuple[str, ...]) -> Dict[Tuple[str, str], ParsedTemplate]:
+    """
+    Parse nested templates into one dict keyed by (language, kind).
+    
+    Languages without their own templates get the Python ones up front, so
+    lookups never need a fallback branch.
+    """
+    parsed = {
+        (language, kind): _bind_fields(_parse_template(template), _STATIC_FIELDS.get(kind, {}))
+        for language, templates in code_templates.items()
+        for kind, template in templates.items()
+    }
+    for language in languages:
+        for kind in code_templates['python']:
+            parsed.setdefault((language, kind), parsed[('python', kind)])
+    return parsed
 
 
 class MultiLanguageSupport:
     """Multi-language programming support system."""
     
-    def __init__(self):
-        self.supported_languages = [
-            'python', 'javascript', 'rust', 'cpp', 'java',
-            'go', 'c', 'typescript', 'kotlin', 'swift'
-        ]
-        
-        self.code_templates = {
-            'python': {
-                'function': 'def {name}({params}):\n    """{docstring}"""\n    {body}\n    return {return_value}',
-                'class': 'class {name}:\n    """{docstring}"""\n    \n    def __init__(self{params}):\n        {body}'
-            },
-            'javascript': {
-                'function': 'function {name}({params}) {{\n    // {docstring}\n    {body}\n    return {return_value};\n}}',
-                'class': 'class {name} {{\n    // {docstring}\n    constructor({params}) {{\n        {body}\n    }}\n}}'
-            }
+    # Language data is static, so it lives on the class and is shared by all
+    # instances; the tuple keeps display order, the frozenset answers lookups
+    supported_languages: ClassVar[Tuple[str, ...]] = (
+        'python', 'javascript', 'rust', 'cpp', 'java',
+        'go', 'c', 'typescript', 'kotlin', 'swift'
+    )
+    SUPPORTED_LANGUAGES: ClassVar[FrozenSet[str]] = frozenset(supported_languages)
+    
+    code_templates: ClassVar[Dict[str, Dict[str, str]]] = {
+        'python': {
+            'function': 'def {name}({params}):\n    """{docstring}"""\n    {body}\n    return {return_value}',
+            'class': 'class {name}:\n    """{docstring}"""\n    \n    def __init__(self{params}):\n        {body}'
+        },
+        'javascript': {
+            'function': 'function {name}({params}) {{\n    // {docstring}\n    {body}\n    return {return_value};\n}}',
+            'class': 'class {name} {{\n    // {docstring}\n    constructor({params}) {{\n        {body}\n    }}\n}}'
         }
+    }
+    
+    # Templates parsed once into chunks with their static fields already
+    # filled in, keyed by (language, kind) for every supported language
+    _parsed: ClassVar[Dict[Tuple[str, str], ParsedTemplate]] = _flatten_templates(
+        code_templates, supported_languages
+    )
+    
+    # Tail of the unsupported-language reply, joined once
+    _UNSUPPORTED_SUFFIX: ClassVar[str] = "' not yet supported\n// Supported: " + ', '.join(supported_languages)
     
     def generate_code(self, language: str, task_description: str) -> str:
         """Generate code in the specified language."""
-        if language.lower() not in self.supported_languages:
-            return f"// Language '{language}' not yet supported\n// Supported: {', '.join(self.supported_languages)}"
+        lang = language.lower()
+        if lang not in self.SUPPORTED_LANGUAGES:
+            return "// Language '" + language + self._UNSUPPORTED_SUFFIX
         
         # Simple code generation based on task description
-        if 'function' in task_description.lower():
-            return self._generate_function_code(language.lower(), task_description)
-        elif 'class' in task_description.lower():
-            return self._generate_class_code(language.lower(), task_description)
+        description_lower = task_description.lower()
+        if 'function' in description_lower:
+            return self._generate_function_code(lang, task_description)
+        elif 'class' in description_lower:
+            return self._generate_class_code(lang, task_description)
         else:
-            return self._generate_general_code(language.lower(), task_description)
+            return self._generate_general_code(lang, task_description)
     
     def _generate_function_code(self, language: str, description: str) -> str:
         """Generate function code."""
-        templates = self.code_templates.get(language, self.code_templates['python'])
-        template = templates.get('function', '// Function template not available')
-        
-        return template.format(
-            name='example_function',
-            params='param1, param2',
-            docstring=f'Generated function for: {description}',
-            body='    # Implementation here\n    pass',
-            return_value='result'
-        )
+        return _render(self._parsed[(language, 'function')], {'docstring': f'Generated function for: {description}'})
     
     def _generate_class_code(self, language: str, description: str) -> str:
         """Generate class code."""
-        templates = self.code_templates.get(language, self.code_templates['python'])
-        template = templates.get('class', '// Class template not available')
-        
-        return template.format(
-            name='ExampleClass',
-            params=', param1, param2',
-            docstring=f'Generated class for: {description}',
-            body='        # Initialization here\n        pass'
-        )
+        return _render(self._parsed[(language, 'class')], {'docstring': f'Generated class for: {description}'})
     
     def _generate_general_code(self, language: str, description: str) -> str:
         """Generate general code."""
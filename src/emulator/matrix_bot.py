@@ -9,12 +9,19 @@ Based on Ribit 2.0 Matrix implementation with enhancements for The Emulator.
 """
 
 import asyncio
+import inspect
+import json
 import logging
 import time
 import os
 import re
+import sys
 import psutil
-from typing import Dict, Set, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, FrozenSet, List, Mapping, Set, Optional, Tuple
 from pathlib import Path
 
 try:
@@ -25,7 +32,8 @@ try:
         RoomMessageText, 
         InviteMemberEvent,
         MatrixRoom,
-        JoinResponse
+        JoinResponse,
+        SyncResponse
     )
     MATRIX_AVAILABLE = True
 except ImportError:
@@ -38,6 +46,83 @@ from .core import AdvancedLLMEmulator
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Messages of conversation context kept per room
+CONTEXT_HISTORY_SIZE = 10
+
+# Most recent event IDs remembered to skip duplicate deliveries
+PROCESSED_EVENTS_LIMIT = 50_000
+
+# Seconds between background saves of changed conversation context
+CONTEXT_SAVE_INTERVAL = 5
+
+# Worker tasks draining the incoming event queue
+EVENT_WORKERS = 4
+
+# Outgoing messages queued within this many seconds are sent together
+SEND_BATCH_WINDOW = 0.02
+
+# Most room_send requests in flight at once
+SEND_CONCURRENCY = 8
+
+# Most room joins from invites in flight at once
+JOIN_CONCURRENCY = 4
+
+# Seconds a disk usage reading is reused by ?sys
+DISK_STATS_TTL = 5
+
+# Seconds a rendered ?sys reply is reused for rapid repeat requests
+SYS_STATUS_TTL = 2.0
+
+# Users allowed to run restricted commands when none (or an empty set) are given
+_DEFAULT_AUTHORIZED_USERS: frozenset = frozenset(map(sys.intern, (
+    "@rabit233:matrix.anarchists.space",
+    "@rabit232:envs.net"
+)))
+
+# Command verbs that require an authorized sender
+_RESTRICTED_COMMANDS = frozenset({'?sys', '?status', '?command'})
+
+# Reply to ?help; static, so built once at import
+_HELP_MESSAGE = """📚 **The Emulator Commands**
+
+**Chat:**
+• `ribit.2.0 <message>` - Chat with me
+• `emulator <message>` - Alternative trigger
+• `!reset` - Clear conversation context
+
+**General Commands:**
+• `?help` - Show this help
+
+**Authorized Commands** (restricted users only):
+• `?sys` - System status
+• `?status` - Bot status  
+• `?command <action>` - Execute actions
+
+**Examples:**
+• `?command open ms paint and draw a house`
+• `ribit.2.0 tell me about quantum computing`
+• `emulator what are your capabilities?`
+
+I am The Emulator, an advanced AI system with emotional intelligence, multi-language programming support, and sophisticated reasoning capabilities. How may I assist you today?"""
+
+# Command summary shown in the startup banner
+_STARTUP_COMMANDS = """⚡ **Available Commands:**
+   • ?help - Show help
+   • ?sys - System status (authorized only)
+   • ?status - Bot status (authorized only)
+   • ?command <action> - Execute actions (authorized only)
+"""
+
+
+@dataclass
+class RoomState:
+    """Per-room bot state, kept together so an event needs one lookup."""
+    __slots__ = ('joined', 'context', 'lock')
+    
+    joined: bool  # Whether the bot is a member of the room
+    context: deque  # Recent "User:"/"Emulator:" lines, bounded by CONTEXT_HISTORY_SIZE
+    lock: Optional[asyncio.Lock]  # Orders replies within the room; created on first message
+
 
 class EmulatorMatrixBot:
     """
@@ -47,8 +132,14 @@ class EmulatorMatrixBot:
     with user authentication and command restrictions.
     """
     
+    # Event type and content fields shared by every outgoing text message
+    _MSG_TYPE: ClassVar[str] = "m.room.message"
+    _CONTENT_BASE: ClassVar[Dict[str, str]] = {"msgtype": "m.text"}
+    
     def __init__(self, homeserver: str, username: str, password: str, 
-                 authorized_users: Set[str] = None):
+                 authorized_users: Optional[Set[str]] = None,
+                 context_file: str = "matrix_context.json",
+                 sync_token_file: str = "matrix_next_batch"):
         """
         Initialize the Emulator Matrix Bot.
         
@@ -57,30 +148,79 @@ class EmulatorMatrixBot:
             username: Bot username (@ribit.2.0:envs.net)
             password: Bot password
             authorized_users: Set of authorized user IDs for commands
+            context_file: JSON file that keeps per-room conversation context
+                across restarts
+            sync_token_file: File that keeps the last sync token, so a restart
+                resumes where the bot left off instead of replaying history
         """
         self.homeserver = homeserver
         self.username = username
         self.password = password
-        self.authorized_users = authorized_users or {
-            "@rabit233:matrix.anarchists.space",
-            "@rabit232:envs.net"
-        }
+        # Interned so the check in _handle_command can match on identity
+        self.authorized_users: Set[str] = set(
+            map(sys.intern, authorized_users or _DEFAULT_AUTHORIZED_USERS)
+        )
         
-        # Initialize The Emulator
-        self.emulator = AdvancedLLMEmulator(personality="curious_researcher")
+        # Initialize The Emulator; set directly, as there is nothing cached yet
+        self._emulator = AdvancedLLMEmulator(personality="curious_researcher")
         
         # Bot state
         self.client = None
-        self.joined_rooms: Set[str] = set()
-        self.processed_events: Set[str] = set()
-        self.conversation_context: Dict[str, list] = {}
+        self.rooms: Dict[str, RoomState] = {}
+        self._joined_count = 0
+        # Insertion-ordered so the oldest ID is evicted first; values are unused
+        self.processed_events: "OrderedDict[str, None]" = OrderedDict()
+        self.context_file = context_file
+        self._context_loaded = False  # read from context_file on first use
+        self._context_dirty = False
+        self.sync_token_file = sync_token_file
         self.terminator_warnings: Dict[str, int] = {}
         
+        # Incoming messages are queued and handled by worker tasks started in start();
+        # per-room locks keep replies in a room in arrival order
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        
+        # Outgoing messages, coalesced and sent by _send_flusher once started
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._send_sem: Optional[asyncio.Semaphore] = None
+        
+        # Invites are joined in background tasks, referenced here until done
+        self._join_sem: Optional[asyncio.Semaphore] = None
+        self._join_tasks: Set[asyncio.Task] = set()
+        
         # Configuration
         self.bot_name = "ribit.2.0"
+        self._bot_name_lower = self.bot_name.lower()
+        # Bot name or the alternative "emulator" trigger, as whole words
+        self._mention_re = re.compile(
+            rf'\b(?:{re.escape(self.bot_name)}|emulator)\b', re.IGNORECASE
+        )
+        self._triggers = (self._bot_name_lower, 'emulator', '!reset')
+        self._cmd_handlers = {
+            '?help': self._get_help_message,
+            '?sys': self._handle_sys_command,
+            '?status': self._handle_status_command,
+        }
+        self._welcome_msg = ("🤖 Greetings! I am The Emulator, an advanced AI system with "
+                             "emotional intelligence and sophisticated reasoning capabilities. "
+                             f"Say '{self.bot_name}' to chat with me, or use ?help for commands.")
         self.sync_timeout = 30000
         self.request_timeout = 10000
-        self.keepalive_interval = 60
+        
+        # Prime psutil's CPU counters so ?sys can read a non-blocking delta
+        psutil.cpu_percent(None)
+        self._disk_cache = (0.0, None)  # (monotonic time, psutil disk usage)
+        self._sys_cache = (0.0, "")  # (monotonic time, rendered ?sys reply)
+        
+        # Emulator metadata shown by ?status and the banner; see invalidate_emulator_cache
+        self._caps_cache: Optional[Dict[str, bool]] = None
+        self._caps_lines: Optional[Tuple[str, ...]] = None
+        self._pers_cache: Optional[Dict[str, Any]] = None
+        self._status_cache: Optional[Tuple[str, str]] = None
+        
+        # Runs emulator calls off the event loop; one worker keeps them serialized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emulator")
         
         logger.info(f"Emulator Matrix Bot initialized for {username}")
     
@@ -125,20 +265,37 @@ class EmulatorMatrixBot:
             # Get joined rooms
             await self._get_joined_rooms()
             
-            # Set up event callbacks
-            self.client.add_event_callback(self._handle_message, RoomMessageText)
-            self.client.add_event_callback(self._handle_invite, InviteMemberEvent)
+            # Send outgoing messages in coalesced batches
+            self._send_queue = asyncio.Queue()
+            self._send_sem = asyncio.Semaphore(SEND_CONCURRENCY)
+            self._workers.append(asyncio.create_task(self._send_flusher()))
+            
+            # Persist conversation context in the background
+            self._workers.append(asyncio.create_task(self._context_saver()))
+            
+            # Start the workers that process queued messages
+            self._event_queue = asyncio.Queue()
+            self._workers.extend(
+                asyncio.create_task(self._event_worker()) for _ in range(EVENT_WORKERS)
+            )
+            
+            # Join invited rooms in the background, a few at a time
+            self._join_sem = asyncio.Semaphore(JOIN_CONCURRENCY)
             
-            # Initial sync
-            logger.info("🔄 Performing initial sync...")
-            sync_response = await self.client.sync(timeout=self.sync_timeout, full_state=False)
-            logger.info(f"✅ Initial sync completed")
+            # Set up callbacks; messages are only handled once caught up
+            self.client.add_event_callback(self._handle_invite, InviteMemberEvent)
+            self.client.add_response_callback(self._save_sync_token, SyncResponse)
             
-            # Mark initial messages as processed
-            await self._mark_initial_messages_processed(sync_response)
+            # Resume from the saved token, or catch up once without answering history
+            since = self._load_sync_token()
+            if since is None:
+                logger.info("🔄 Performing initial sync...")
+                await self.client.sync(timeout=self.sync_timeout, full_state=False)
+                logger.info(f"✅ Initial sync completed")
+            else:
+                logger.info("🔄 Resuming from saved sync token")
             
-            # Start background tasks
-            asyncio.create_task(self._keepalive_task())
+            self.client.add_event_callback(self._handle_message, RoomMessageText)
             
             # Display startup information
             self._display_startup_info(response.device_id)
@@ -146,14 +303,24 @@ class EmulatorMatrixBot:
             # Sync forever
             await self.client.sync_forever(
                 timeout=self.sync_timeout,
-                full_state=False
+                full_state=False,
+                since=since
             )
             
         except Exception as e:
             logger.error(f"Matrix bot error: {e}")
             raise
         finally:
+            for worker in self._workers:
+                worker.cancel()
+            for task in self._join_tasks:
+                task.cancel()
+            self._save_context()
+            self._executor.shutdown(wait=False)
+            self.emulator.close()
             if self.client:
+                if self.client.next_batch:
+                    self._write_sync_token(self.client.next_batch)
                 await self.client.close()
     
     async def _run_mock_mode(self):
@@ -182,34 +349,63 @@ class EmulatorMatrixBot:
             except KeyboardInterrupt:
                 break
         
+        self._save_context()
         print("👋 Mock mode ended")
     
     async def _get_joined_rooms(self):
         """Get list of joined rooms."""
         try:
             joined_rooms_response = await self.client.joined_rooms()
-            if hasattr(joined_rooms_response, 'rooms'):
-                for room_id in joined_rooms_response.rooms:
-                    self.joined_rooms.add(room_id)
-                    logger.info(f"📍 Already in room: {room_id}")
+            try:
+                rooms = joined_rooms_response.rooms
+            except AttributeError:
+                # Error responses carry no room list
+                return
+            for room_id in rooms:
+                self._mark_joined(room_id)
+                logger.info(f"📍 Already in room: {room_id}")
         except Exception as e:
             logger.error(f"Error getting joined rooms: {e}")
     
-    async def _mark_initial_messages_processed(self, sync_response):
-        """Mark all messages from initial sync as processed."""
+    def _load_sync_token(self) -> Optional[str]:
+        """Read the saved sync token, or None on first run."""
         try:
-            if hasattr(sync_response, 'rooms') and hasattr(sync_response.rooms, 'join'):
-                for room_id, room_data in sync_response.rooms.join.items():
-                    if hasattr(room_data, 'timeline') and hasattr(room_data.timeline, 'events'):
-                        for event in room_data.timeline.events:
-                            if hasattr(event, 'event_id'):
-                                self.processed_events.add(event.event_id)
-        except Exception as e:
-            logger.error(f"Error marking initial messages: {e}")
+            with open(self.sync_token_file, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def _write_sync_token(self, token: str):
+        """Write the sync token beside the target and swap it in atomically."""
+        try:
+            tmp_file = self.sync_token_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(token)
+            os.replace(tmp_file, self.sync_token_file)
+        except OSError as e:
+            logger.error(f"Error saving sync token: {e}")
+    
+    async def _save_sync_token(self, response: "SyncResponse"):
+        """Persist each sync's next_batch token off the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_sync_token, response.next_batch)
+    
+    def _mark_processed(self, event_id: str):
+        """Remember an event ID, forgetting the oldest once the limit is reached."""
+        processed = self.processed_events
+        processed[event_id] = None
+        processed.move_to_end(event_id)
+        if len(processed) > PROCESSED_EVENTS_LIMIT:
+            processed.popitem(last=False)
     
     async def _handle_message(self, room: MatrixRoom, event: RoomMessageText):
         """Handle incoming Matrix messages."""
         try:
+            # Most room traffic is not for the bot; drop it before any bookkeeping
+            folded = self._fold_for_bot(event.body)
+            if folded is None:
+                return
+            
             # Skip if already processed
             if event.event_id in self.processed_events:
                 return
@@ -219,45 +415,76 @@ class EmulatorMatrixBot:
                 return
             
             # Mark as processed
-            self.processed_events.add(event.event_id)
-            
-            # Process the message
-            response = await self._process_message(event.body, event.sender, room.room_id)
+            self._mark_processed(event.event_id)
             
-            if response:
-                await self._send_message(room.room_id, response)
+            # Hand off to the workers so the sync loop keeps going
+            self._event_queue.put_nowait((room.room_id, event.body, event.sender, folded))
             
         except Exception as e:
             logger.error(f"Error handling message: {e}")
     
+    async def _event_worker(self):
+        """Process queued messages, overlapping sends with other rooms' work."""
+        queue = self._event_queue
+        while True:
+            room_id, body, sender, folded = await queue.get()
+            try:
+                room = self._room(room_id)
+                if room.lock is None:
+                    room.lock = asyncio.Lock()
+                async with room.lock:
+                    response = await self._process_message(body, sender, room_id, room, folded)
+                    if response:
+                        await self._send_message(room_id, response)
+            except Exception as e:
+                logger.error(f"Error handling message: {e}")
+            finally:
+                queue.task_done()
+    
     async def _handle_invite(self, room: MatrixRoom, event: InviteMemberEvent):
         """Handle room invitations."""
         try:
             if event.state_key == self.client.user_id:
                 logger.info(f"📨 Received invite to room: {room.room_id}")
                 
-                # Auto-join the room
-                join_response = await self.client.join(room.room_id)
-                if isinstance(join_response, JoinResponse):
-                    self.joined_rooms.add(room.room_id)
-                    logger.info(f"✅ Joined room: {room.room_id}")
-                    
-                    # Send welcome message
-                    welcome_msg = ("🤖 Greetings! I am The Emulator, an advanced AI system with "
-                                 "emotional intelligence and sophisticated reasoning capabilities. "
-                                 f"Say '{self.bot_name}' to chat with me, or use ?help for commands.")
-                    await self._send_message(room.room_id, welcome_msg)
-                else:
-                    logger.error(f"Failed to join room: {join_response}")
+                # Join in the background so a burst of invites doesn't stall the sync loop
+                task = asyncio.create_task(self._join_and_welcome(room.room_id))
+                self._join_tasks.add(task)
+                task.add_done_callback(self._join_tasks.discard)
         except Exception as e:
             logger.error(f"Error handling invite: {e}")
     
-    async def _process_message(self, message: str, sender: str, room_id: str) -> Optional[str]:
-        """Process a message and generate a response."""
+    async def _join_and_welcome(self, room_id: str):
+        """Join an invited room and greet it, within the join concurrency limit."""
+        try:
+            async with self._join_sem:
+                join_response = await self.client.join(room_id)
+            if isinstance(join_response, JoinResponse):
+                self._mark_joined(room_id)
+                logger.info(f"✅ Joined room: {room_id}")
+                
+                # Send welcome message
+                await self._send_message(room_id, self._welcome_msg)
+            else:
+                logger.error(f"Failed to join room: {join_response}")
+        except Exception as e:
+            logger.error(f"Error handling invite: {e}")
+    
+    async def _process_message(self, message: str, sender: str, room_id: str,
+                               room: Optional[RoomState] = None,
+                               folded: Optional[str] = None) -> Optional[str]:
+        """
+        Process a message and generate a response.
+        
+        Callers that already looked up the room or ran _fold_for_bot pass the
+        results as room and folded so the work is not repeated.
+        """
         try:
             # Check if message is directed at the bot
-            if not self._is_message_for_bot(message):
-                return None
+            if folded is None:
+                folded = self._fold_for_bot(message)
+                if folded is None:
+                    return None
             
             # Clean the message
             clean_message = self._clean_message(message)
@@ -266,20 +493,24 @@ class EmulatorMatrixBot:
             if clean_message.startswith('?'):
                 return await self._handle_command(clean_message, sender, room_id)
             
-            # Handle reset command
-            if '!reset' in clean_message.lower():
-                if room_id in self.conversation_context:
-                    del self.conversation_context[room_id]
+            if room is None:
+                room = self._room(room_id)
+            
+            # Handle reset command; mention removal never joins or splits "!reset"
+            if '!reset' in folded:
+                if room.context:
+                    room.context.clear()
+                    self._context_dirty = True
                 return "🔄 Conversation context reset. How may I assist you?"
             
             # Add to conversation context
-            self._add_to_context(room_id, f"User: {clean_message}")
+            self._add_to_context(room, f"User: {clean_message}")
             
             # Get AI response from The Emulator
-            ai_response = self.emulator.get_decision(clean_message)
+            ai_response = await self._get_decision(clean_message)
             
             # Add AI response to context
-            self._add_to_context(room_id, f"Emulator: {ai_response}")
+            self._add_to_context(room, f"Emulator: {ai_response}")
             
             return ai_response
             
@@ -287,72 +518,195 @@ class EmulatorMatrixBot:
             logger.error(f"Error processing message: {e}")
             return "I apologize, but I encountered an error processing your message."
     
-    def _is_message_for_bot(self, message: str) -> bool:
-        """Check if message is directed at the bot."""
-        message_lower = message.lower()
-        return (
-            self.bot_name in message_lower or
-            'emulator' in message_lower or
-            message.startswith('?') or
-            '!reset' in message_lower
-        )
+    async def _get_decision(self, prompt: str) -> str:
+        """
+        Run the emulator on a worker thread so other rooms keep being served.
+        
+        The emulator keeps mutable state (emotions, knowledge), so its
+        dedicated executor has a single worker and calls run one at a time.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.emulator.get_decision, prompt)
+    
+    def _fold_for_bot(self, message: str) -> Optional[str]:
+        """
+        Check if message is directed at the bot.
+        
+        Returns:
+            None when it is not; otherwise the case-folded message, reused for
+            the !reset check. Commands skip the fold and return the message
+            as-is, since they never reach that check.
+        """
+        if message.startswith('?'):
+            return message
+        folded = message.casefold()
+        if any(trigger in folded for trigger in self._triggers):
+            return folded
+        return None
     
     def _clean_message(self, message: str) -> str:
         """Clean the message by removing bot mentions."""
-        # Remove bot name mentions
-        clean = re.sub(rf'\\b{re.escape(self.bot_name)}\\b', '', message, flags=re.IGNORECASE)
-        clean = re.sub(r'\\bemulator\\b', '', clean, flags=re.IGNORECASE)
-        return clean.strip()
+        # Remove bot name and "emulator" mentions in one pass
+        return self._mention_re.sub('', message).strip()
     
-    def _add_to_context(self, room_id: str, message: str):
-        """Add message to conversation context."""
-        if room_id not in self.conversation_context:
-            self.conversation_context[room_id] = []
+    def _room(self, room_id: str) -> RoomState:
+        """Get a room's state, creating it on first sight."""
+        if not self._context_loaded:
+            self._load_context()
+        room = self.rooms.get(room_id)
+        if room is None:
+            # Bounded so the oldest message drops off without reallocating
+            room = self.rooms[room_id] = RoomState(
+                joined=False, context=deque(maxlen=CONTEXT_HISTORY_SIZE), lock=None
+            )
+        return room
+    
+    def _mark_joined(self, room_id: str):
+        """Record that the bot is in a room."""
+        room = self._room(room_id)
+        if not room.joined:
+            room.joined = True
+            self._joined_count += 1
+    
+    @property
+    def joined_rooms(self) -> FrozenSet[str]:
+        """
+        IDs of the rooms the bot is in.
+        
+        A read-only snapshot; room membership follows Matrix join events.
+        """
+        return frozenset(room_id for room_id, room in self.rooms.items() if room.joined)
+    
+    @property
+    def conversation_context(self) -> Mapping[str, Tuple[str, ...]]:
+        """
+        Per-room conversation context, for rooms that have any.
         
-        self.conversation_context[room_id].append(message)
+        A read-only snapshot that raises on mutation; context changes go
+        through message handling and the !reset command.
+        """
+        return MappingProxyType({
+            room_id: tuple(room.context) for room_id, room in self.rooms.items() if room.context
+        })
+    
+    def _add_to_context(self, room: RoomState, message: str):
+        """Add message to conversation context."""
+        room.context.append(message)
+        self._context_dirty = True
+    
+    def _load_context(self):
+        """Load saved per-room context; rooms already in memory take precedence."""
+        self._context_loaded = True
+        try:
+            with open(self.context_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
         
-        # Keep only last 10 messages for context
-        if len(self.conversation_context[room_id]) > 10:
-            self.conversation_context[room_id] = self.conversation_context[room_id][-10:]
+        for room_id, messages in saved.items():
+            room = self._room(room_id)
+            if not room.context:
+                room.context.extend(messages)
+    
+    def _snapshot_context(self) -> Optional[str]:
+        """Serialize the context if it changed since the last snapshot."""
+        if not self._context_dirty:
+            return None
+        self._context_dirty = False
+        return json.dumps(
+            {room_id: list(room.context) for room_id, room in self.rooms.items() if room.context},
+            ensure_ascii=False
+        )
+    
+    def _write_context(self, data: str):
+        """Write a context snapshot beside the target and swap it in atomically."""
+        try:
+            tmp_file = self.context_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_file, self.context_file)
+        except OSError as e:
+            logger.error(f"Error saving conversation context: {e}")
+    
+    def _save_context(self):
+        """Write changed context now; used on shutdown."""
+        data = self._snapshot_context()
+        if data is not None:
+            self._write_context(data)
+    
+    async def _context_saver(self):
+        """Save changed context every CONTEXT_SAVE_INTERVAL seconds, off the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(CONTEXT_SAVE_INTERVAL)
+            data = self._snapshot_context()
+            if data is not None:
+                await loop.run_in_executor(None, self._write_context, data)
     
     async def _send_message(self, room_id: str, message: str):
-        """Send a message to a Matrix room."""
+        """Send a message to a Matrix room, via the send queue once it is running."""
+        if self._send_queue is not None:
+            self._send_queue.put_nowait((room_id, message))
+        else:
+            await self._room_send(room_id, message)
+    
+    async def _room_send(self, room_id: str, message: str):
+        """Post one message to a Matrix room."""
         try:
             if self.client:
                 await self.client.room_send(
                     room_id=room_id,
-                    message_type="m.room.message",
-                    content={
-                        "msgtype": "m.text",
-                        "body": message
-                    }
+                    message_type=self._MSG_TYPE,
+                    content={**self._CONTENT_BASE, "body": message}
                 )
         except Exception as e:
             logger.error(f"Error sending message: {e}")
     
+    async def _send_room_batch(self, room_id: str, messages: List[str]):
+        """Send one room's share of a batch in order, within the concurrency limit."""
+        async with self._send_sem:
+            for message in messages:
+                await self._room_send(room_id, message)
+    
+    async def _send_flusher(self):
+        """Collect messages queued within SEND_BATCH_WINDOW and send rooms concurrently."""
+        queue = self._send_queue
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(SEND_BATCH_WINDOW)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            # Group by room so each room's messages keep their order
+            by_room: Dict[str, List[str]] = {}
+            for room_id, message in batch:
+                by_room.setdefault(room_id, []).append(message)
+            await asyncio.gather(*(
+                self._send_room_batch(room_id, messages) for room_id, messages in by_room.items()
+            ))
+    
     async def _handle_command(self, command: str, sender: str, room_id: str) -> str:
         """Handle special commands."""
         try:
+            verb, _, arg = command.partition(' ')
+            
             # Check authorization for system commands
-            if command.startswith(('?sys', '?status', '?command')):
+            if verb in _RESTRICTED_COMMANDS:
+                sender = sys.intern(sender)
                 if sender not in self.authorized_users:
                     return self._handle_unauthorized_command(sender, command)
             
-            # Handle different commands
-            if command == '?help':
-                return self._get_help_message()
-            
-            elif command == '?sys':
-                return await self._handle_sys_command()
-            
-            elif command == '?status':
-                return await self._handle_status_command()
-            
-            elif command.startswith('?command '):
-                return await self._handle_action_command(command[9:])
-            
+            if arg:
+                if verb == '?command':
+                    return await self._handle_action_command(arg)
             else:
-                return f"Unknown command: {command}. Use ?help for available commands."
+                # Argument-less commands dispatch through the handler table
+                handler = self._cmd_handlers.get(verb)
+                if handler is not None:
+                    result = handler()
+                    return await result if inspect.isawaitable(result) else result
+            
+            return f"Unknown command: {command}. Use ?help for available commands."
                 
         except Exception as e:
             logger.error(f"Error handling command: {e}")
@@ -379,135 +733,160 @@ class EmulatorMatrixBot:
     
     def _get_help_message(self) -> str:
         """Get help message."""
-        return """📚 **The Emulator Commands**
-
-**Chat:**
-• `ribit.2.0 <message>` - Chat with me
-• `emulator <message>` - Alternative trigger
-• `!reset` - Clear conversation context
-
-**General Commands:**
-• `?help` - Show this help
-
-**Authorized Commands** (restricted users only):
-• `?sys` - System status
-• `?status` - Bot status  
-• `?command <action>` - Execute actions
-
-**Examples:**
-• `?command open ms paint and draw a house`
-• `ribit.2.0 tell me about quantum computing`
-• `emulator what are your capabilities?`
-
-I am The Emulator, an advanced AI system with emotional intelligence, multi-language programming support, and sophisticated reasoning capabilities. How may I assist you today?"""
+        return _HELP_MESSAGE
     
     async def _handle_sys_command(self) -> str:
         """Handle system status command."""
+        now = time.monotonic()
+        rendered_at, response = self._sys_cache
+        if response and now - rendered_at < SYS_STATUS_TTL:
+            return response
+        
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(None)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            disk = await self._disk_usage()
             
-            return f"""🖥️ **System Status**
+            # Shift by 30 bits for whole GiB
+            response = f"""🖥️ **System Status**
 
 **CPU:** {cpu_percent}%
-**Memory:** {memory.percent}% ({memory.used // 1024**3}GB / {memory.total // 1024**3}GB)
-**Disk:** {disk.percent}% ({disk.used // 1024**3}GB / {disk.total // 1024**3}GB)
-**Matrix Rooms:** {len(self.joined_rooms)}
+**Memory:** {memory.percent}% ({memory.used >> 30}GB / {memory.total >> 30}GB)
+**Disk:** {disk.percent}% ({disk.used >> 30}GB / {disk.total >> 30}GB)
+**Matrix Rooms:** {self._joined_count}
 **Status:** Operational ✅"""
+            self._sys_cache = (now, response)
+            return response
             
         except ImportError:
             return "🖥️ **System Status:** Monitoring tools not available, but I'm operational! ✅"
     
+    @property
+    def emulator(self) -> AdvancedLLMEmulator:
+        """
+        The emulator answering chat messages and commands.
+        
+        Assigning another emulator drops the metadata cached from the old one.
+        """
+        return self._emulator
+    
+    @emulator.setter
+    def emulator(self, emulator: AdvancedLLMEmulator):
+        self._emulator = emulator
+        self.invalidate_emulator_cache()
+    
+    def _capabilities(self) -> Dict[str, bool]:
+        """Emulator capabilities, computed once until the cache is invalidated."""
+        if self._caps_cache is None:
+            self._caps_cache = self.emulator.get_capabilities()
+        return self._caps_cache
+    
+    def _capability_lines(self) -> Tuple[str, ...]:
+        """Rendered "Name: ✅/❌" capability lines, cached with the capabilities."""
+        if self._caps_lines is None:
+            self._caps_lines = tuple(
+                f"{cap.replace('_', ' ').title()}: {'✅' if enabled else '❌'}"
+                for cap, enabled in self._capabilities().items()
+            )
+        return self._caps_lines
+    
+    def _personality(self) -> Dict[str, Any]:
+        """Emulator personality info, computed once until the cache is invalidated."""
+        if self._pers_cache is None:
+            self._pers_cache = self.emulator.get_personality_info()
+        return self._pers_cache
+    
+    def invalidate_emulator_cache(self):
+        """Drop cached emulator metadata; call after changing the emulator's personality in place."""
+        self._caps_cache = None
+        self._caps_lines = None
+        self._pers_cache = None
+        self._status_cache = None
+    
+    async def _disk_usage(self):
+        """Root disk usage, cached briefly since it changes slowly."""
+        now = time.monotonic()
+        read_at, disk = self._disk_cache
+        if disk is None or now - read_at > DISK_STATS_TTL:
+            # statvfs can stall on slow or network filesystems; keep it off the loop
+            loop = asyncio.get_running_loop()
+            disk = await loop.run_in_executor(None, psutil.disk_usage, '/')
+            self._disk_cache = (now, disk)
+        return disk
+    
     async def _handle_status_command(self) -> str:
         """Handle bot status command."""
-        capabilities = self.emulator.get_capabilities()
-        personality = self.emulator.get_personality_info()
-        
-        status_msg = f"""🤖 **The Emulator Status**
+        # Only the room count changes between calls; the rest is cached
+        head, tail = self._status_parts()
+        return f"{head}{self._joined_count}{tail}"
+    
+    def _status_parts(self) -> Tuple[str, str]:
+        """?status text before and after the room count, cached with the emulator metadata."""
+        if self._status_cache is None:
+            personality = self._personality()
+            
+            head = f"""🤖 **The Emulator Status**
 
 **Core Status:** Operational ✅
 **AI Engine:** Advanced LLM Emulator Active
 **Emotional Intelligence:** {len(self.emulator.emotions.emotions)} emotions available
-**Matrix Rooms:** {len(self.joined_rooms)}
-
-**Capabilities:**"""
-        
-        for cap, enabled in capabilities.items():
-            status = "✅" if enabled else "❌"
-            status_msg += f"\\n• {cap.replace('_', ' ').title()}: {status}"
-        
-        status_msg += f"\\n\\n**Personality:** {', '.join(personality['traits']['core_traits'])}"
-        status_msg += f"\\n**Session ID:** {personality['session_id']}"
-        
-        return status_msg
+**Matrix Rooms:** """
+            
+            parts = ["\n\n**Capabilities:**"]
+            parts.extend(f"• {line}" for line in self._capability_lines())
+            parts.append(f"\n**Personality:** {', '.join(personality['traits']['core_traits'])}")
+            parts.append(f"**Session ID:** {personality['session_id']}")
+            
+            self._status_cache = (head, "\n".join(parts))
+        return self._status_cache
     
     async def _handle_action_command(self, action: str) -> str:
         """Handle action execution command."""
         try:
             # Use The Emulator to process the action
-            decision = self.emulator.get_decision(f"Execute this action: {action}")
+            decision = await self._get_decision(f"Execute this action: {action}")
             
             # For now, return the AI's decision about the action
             # In a full implementation, this would execute actual system commands
-            return f"🎯 **Action Analysis:** {action}\\n\\n🧠 **AI Response:** {decision}\\n\\n⚠️ *Note: Actual system execution requires additional security implementation.*"
+            return f"🎯 **Action Analysis:** {action}\n\n🧠 **AI Response:** {decision}\n\n⚠️ *Note: Actual system execution requires additional security implementation.*"
             
         except Exception as e:
             logger.error(f"Error handling action command: {e}")
             return f"❌ Error processing action: {action}"
     
-    async def _keepalive_task(self):
-        """Background keepalive task."""
-        while True:
-            try:
-                await asyncio.sleep(self.keepalive_interval)
-                
-                # Simple sync to keep connection alive
-                if self.client:
-                    await self.client.sync(timeout=5000, full_state=False)
-                    logger.debug("Keepalive sync completed")
-                    
-            except Exception as e:
-                logger.debug(f"Keepalive error: {e}")
-                await asyncio.sleep(10)
-    
     def _display_startup_info(self, device_id: str):
-        """Display startup information."""
-        print("=" * 60)
-        print("🤖 The Emulator Matrix Bot - ACTIVE!")
-        print("=" * 60)
-        print(f"✅ Identity: {self.username}")
-        print(f"✅ Bot Name: {self.bot_name}")
-        print(f"🔑 Device ID: {device_id}")
-        print(f"🏠 Homeserver: {self.homeserver}")
-        print(f"📍 Joined Rooms: {len(self.joined_rooms)}")
-        print("✅ Auto-accepting room invites")
-        print(f"📝 Triggers: '{self.bot_name}', 'emulator'")
-        print("💬 Reply to my messages to continue conversations")
-        print("🔄 Reset: '!reset' to clear context")
-        print("📚 Help: ?help for all commands")
-        print("")
-        print("🔐 **Authorized Users:**")
-        for user in self.authorized_users:
-            print(f"   • {user}")
-        print("")
-        print("⚡ **Available Commands:**")
-        print("   • ?help - Show help")
-        print("   • ?sys - System status (authorized only)")
-        print("   • ?status - Bot status (authorized only)")
-        print("   • ?command <action> - Execute actions (authorized only)")
-        print("")
-        print("🧠 **AI Capabilities:**")
-        capabilities = self.emulator.get_capabilities()
-        for cap, enabled in capabilities.items():
-            status = "✅" if enabled else "❌"
-            print(f"   • {cap.replace('_', ' ').title()}: {status}")
-        print("")
-        personality = self.emulator.get_personality_info()
-        print(f"🎭 **Personality:** {', '.join(personality['traits']['core_traits'])}")
-        print("=" * 60)
-        print("🚀 Ready for intelligent automation!")
-        print("=" * 60)
+        """Display startup information as a single write to stdout."""
+        rule = "=" * 60
+        lines = [
+            rule,
+            "🤖 The Emulator Matrix Bot - ACTIVE!",
+            rule,
+            f"✅ Identity: {self.username}",
+            f"✅ Bot Name: {self.bot_name}",
+            f"🔑 Device ID: {device_id}",
+            f"🏠 Homeserver: {self.homeserver}",
+            f"📍 Joined Rooms: {self._joined_count}",
+            "✅ Auto-accepting room invites",
+            f"📝 Triggers: '{self.bot_name}', 'emulator'",
+            "💬 Reply to my messages to continue conversations",
+            "🔄 Reset: '!reset' to clear context",
+            "📚 Help: ?help for all commands",
+            "",
+            "🔐 **Authorized Users:**",
+        ]
+        lines.extend(f"   • {user}" for user in self.authorized_users)
+        lines.extend(("", _STARTUP_COMMANDS, "🧠 **AI Capabilities:**"))
+        lines.extend(f"   • {line}" for line in self._capability_lines())
+        personality = self._personality()
+        lines.extend((
+            "",
+            f"🎭 **Personality:** {', '.join(personality['traits']['core_traits'])}",
+            rule,
+            "🚀 Ready for intelligent automation!",
+            rule,
+        ))
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 
 # Main execution function
@@ -530,6 +909,12 @@ async def main():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
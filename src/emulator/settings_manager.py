@@ -7,15 +7,194 @@ and runtime configuration updates.
 Based on the advanced_settings_manager.py from Ribit 2.0 collection.
 """
 
+import atexit
+import copy
+import hashlib
 import json
 import os
 import logging
-from typing import Dict, Any, Optional, List, Union
+import shutil
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Any, Iterable, Optional, List, Tuple, Union
 from pathlib import Path
-from datetime import datetime
+from types import MappingProxyType
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Marks a setting path with no value, in the flat shadow and in tree walks
+_MISSING = object()
+
+# Personalities the emulator can be configured with
+_PERSONALITIES = frozenset({"curious_researcher", "creative_assistant", "wise_mentor"})
+
+
+def _is_positive_number(value: Any) -> bool:
+    """True for an int or float greater than zero."""
+    return isinstance(value, (int, float)) and value > 0
+
+
+# Setting path -> (check, warning template) applied by validation; failures are logged
+_VALIDATORS: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "emulator.personality": (
+        lambda value: isinstance(value, str) and value in _PERSONALITIES,
+        "Invalid personality: {value}"
+    ),
+    "matrix.homeserver": (
+        lambda value: isinstance(value, str) and value.startswith(("http://", "https://")),
+        "Invalid homeserver URL: {value}"
+    ),
+    "matrix.username": (
+        lambda value: isinstance(value, str) and value.startswith("@"),
+        "Invalid Matrix username: {value}"
+    ),
+    **{
+        path: (_is_positive_number, "Invalid numeric setting {path}: {value}")
+        for path in (
+            "matrix.sync_timeout",
+            "matrix.request_timeout",
+            "matrix.keepalive_interval",
+            "emulator.max_context_length",
+            "emulator.response_timeout"
+        )
+    }
+}
+
+# Environment variable -> (setting path, conversion); values that fail to convert are skipped
+_ENV_MAPPINGS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("MATRIX_HOMESERVER", "matrix.homeserver", str),
+    ("MATRIX_USERNAME", "matrix.username", str),
+    ("MATRIX_SYNC_TIMEOUT", "matrix.sync_timeout", int),
+    ("MATRIX_REQUEST_TIMEOUT", "matrix.request_timeout", int),
+    ("MATRIX_KEEPALIVE_INTERVAL", "matrix.keepalive_interval", int),
+    ("EMULATOR_PERSONALITY", "emulator.personality", str),
+    ("EMULATOR_LOG_LEVEL", "emulator.log_level", str),
+    ("EMULATOR_KNOWLEDGE_FILE", "emulator.knowledge_file", str)
+)
+
+# Settings backups kept; older ones are deleted as new ones are made
+BACKUP_LIMIT = 10
+
+# Seconds a deferred save waits so a burst of changes is written once
+SAVE_DELAY = 0.5
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to indented, key-sorted UTF-8 JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to indented, key-sorted UTF-8 JSON."""
+        return json.dumps(obj, indent=2, sort_keys=True).encode('utf-8')
+    
+    _loads = json.loads
+
+
+# Built-in defaults; never mutated, see _default_settings
+_DEFAULT_SETTINGS_DATA: Dict[str, Any] = {
+    "emulator": {
+        "personality": "curious_researcher",
+        "log_level": "INFO",
+        "knowledge_file": "emulator_knowledge.json",
+        "max_context_length": 10,
+        "response_timeout": 30
+    },
+    "matrix": {
+        "homeserver": "https://envs.net",
+        "username": "@ribit.2.0:envs.net",
+        "sync_timeout": 30000,
+        "request_timeout": 10,
+        "keepalive_interval": 60,
+        "auto_join_rooms": True,
+        "authorized_users": [
+            "@rabit233:matrix.anarchists.space",
+            "@rabit232:envs.net"
+        ]
+    },
+    "features": {
+        "emotional_intelligence": True,
+        "multi_language_support": True,
+        "knowledge_management": True,
+        "vision_processing": True,
+        "adaptive_learning": True,
+        "code_generation": True
+    },
+    "security": {
+        "command_authorization": True,
+        "rate_limiting": True,
+        "max_requests_per_minute": 60,
+        "blocked_users": [],
+        "allowed_commands": [
+            "?help", "?sys", "?status", "?command"
+        ]
+    },
+    "performance": {
+        "max_concurrent_requests": 10,
+        "cache_size": 1000,
+        "cleanup_interval": 3600,
+        "memory_limit_mb": 512
+    }
+}
+_DEFAULT_SETTINGS = MappingProxyType(_DEFAULT_SETTINGS_DATA)
+
+# Serialized once, in declaration order, so fresh copies are a single parse
+# instead of a deepcopy
+_DEFAULT_SETTINGS_JSON = json.dumps(_DEFAULT_SETTINGS_DATA)
+
+
+def _default_settings() -> Dict[str, Any]:
+    """A fresh, fully independent copy of the default settings."""
+    return _loads(_DEFAULT_SETTINGS_JSON)
+
+
+@lru_cache(maxsize=256)
+def _split_path(key_path: str) -> Tuple[str, ...]:
+    """Split a dotted setting path into its keys, cached since callers reuse a few paths."""
+    return tuple(key_path.split('.'))
+
+
+def _copy_child(parent: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Replace parent[key] with a copy of that section, or a new empty one, and return it."""
+    if key in parent:
+        section = parent[key]
+        if not isinstance(section, dict):
+            raise TypeError(f"Setting '{key}' is not a section")
+        section = dict(section)
+    else:
+        section = {}
+    parent[key] = section
+    return section
+
+
+def _detached(value: Any) -> Any:
+    """A deep copy of a list or dict setting, so callers cannot change the stored tree."""
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _walk(root: Dict[str, Any], key_path: str, default: Any) -> Any:
+    """Look a dotted path up in a settings tree."""
+    value = root
+    for key in _split_path(key_path):
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+    return value
+
 
 class AdvancedSettingsManager:
     """
@@ -42,54 +221,43 @@ class AdvancedSettingsManager:
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(exist_ok=True)
         
-        # Default settings
-        self.default_settings = {
-            "emulator": {
-                "personality": "curious_researcher",
-                "log_level": "INFO",
-                "knowledge_file": "emulator_knowledge.json",
-                "max_context_length": 10,
-                "response_timeout": 30
-            },
-            "matrix": {
-                "homeserver": "https://envs.net",
-                "username": "@ribit.2.0:envs.net",
-                "sync_timeout": 30000,
-                "request_timeout": 10,
-                "keepalive_interval": 60,
-                "auto_join_rooms": True,
-                "authorized_users": [
-                    "@rabit233:matrix.anarchists.space",
-                    "@rabit232:envs.net"
-                ]
-            },
-            "features": {
-                "emotional_intelligence": True,
-                "multi_language_support": True,
-                "knowledge_management": True,
-                "vision_processing": True,
-                "adaptive_learning": True,
-                "code_generation": True
-            },
-            "security": {
-                "command_authorization": True,
-                "rate_limiting": True,
-                "max_requests_per_minute": 60,
-                "blocked_users": [],
-                "allowed_commands": [
-                    "?help", "?sys", "?status", "?command"
-                ]
-            },
-            "performance": {
-                "max_concurrent_requests": 10,
-                "cache_size": 1000,
-                "cleanup_interval": 3600,
-                "memory_limit_mb": 512
-            }
-        }
+        # Existing backups, oldest first; listed once, then tracked in memory.
+        # Ordered by mtime, since older releases named backups by date and time
+        with os.scandir(self.backup_dir) as entries:
+            existing = sorted(
+                (entry.stat().st_mtime_ns, entry.name) for entry in entries
+                if entry.name.startswith("settings_backup_") and entry.name.endswith(".json")
+            )
+        self._backups: Deque[Path] = deque(self.backup_dir / name for _, name in existing)
+        
+        # Read-only view of the defaults; working copies come from _default_settings()
+        self.default_settings = _DEFAULT_SETTINGS
+        
+        # Current settings. Copy-on-write: changes build a new tree and swap it
+        # in with one assignment, so readers never see a half-applied update
+        self.settings: Dict[str, Any] = {}
+        
+        # Derived views of self.settings, rebuilt on first use after any change:
+        # a flat dotted-path -> leaf value map for one-lookup reads, the
+        # get_matrix_config/get_emulator_config results, and frozenset shadows
+        # of the user/command lists for O(1) membership tests. The flat map is
+        # paired with the tree it was built from; a different tree means stale
+        self._flat_view: Tuple[Optional[Dict[str, Any]], Dict[str, Any]] = (None, {})
+        self._config_cache: Dict[str, Dict[str, Any]] = {}
+        self._authorized_users_set: frozenset = frozenset()
+        self._blocked_users_set: frozenset = frozenset()
+        self._allowed_commands_set: frozenset = frozenset()
+        
+        # Digest of the bytes last read from or written to settings_file
+        self._saved_digest: Optional[bytes] = None
+        
+        # Saves requested by setters are coalesced and written by a timer thread.
+        # An exit-time flush is registered only while a save is pending, so an
+        # idle manager is not kept alive until interpreter exit
+        self._save_lock = threading.Lock()
+        self._save_pending: bool = False
+        self._flush_timer: Optional[threading.Timer] = None
         
-        # Current settings
-        self.settings = {}
         self.load_settings()
     
     def load_settings(self) -> bool:
@@ -101,16 +269,19 @@ class AdvancedSettingsManager:
         """
         try:
             # Start with default settings
-            self.settings = self.default_settings.copy()
+            settings = _default_settings()
             
             # Load from file if it exists
             if self.settings_file.exists():
-                with open(self.settings_file, 'r') as f:
-                    file_settings = json.load(f)
-                    self._merge_settings(self.settings, file_settings)
+                with open(self.settings_file, 'rb') as f:
+                    raw = f.read()
+                self._saved_digest = hashlib.blake2b(raw, digest_size=16).digest()
+                file_settings = _loads(raw)
+                self._merge_settings(settings, file_settings)
                 logger.info(f"Settings loaded from {self.settings_file}")
             else:
                 logger.info("Using default settings (no settings file found)")
+            self.settings = settings
             
             # Override with environment variables
             self._load_from_environment()
@@ -122,7 +293,7 @@ class AdvancedSettingsManager:
             
         except Exception as e:
             logger.error(f"Error loading settings: {e}")
-            self.settings = self.default_settings.copy()
+            self.settings = _default_settings()
             return False
     
     def save_settings(self, create_backup: bool = True) -> bool:
@@ -136,13 +307,27 @@ class AdvancedSettingsManager:
             True if settings saved successfully, False otherwise
         """
         try:
+            data = _dumps(self.settings)
+            
+            # Nothing changed since the last load or save: skip the backup and write
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            exists = self.settings_file.exists()
+            if digest == self._saved_digest and exists:
+                return True
+            
             # Create backup if requested
-            if create_backup and self.settings_file.exists():
+            if create_backup and exists:
                 self._create_backup()
             
-            # Save settings
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2, sort_keys=True)
+            # Write beside the target and swap it in atomically, so a crash
+            # mid-write never leaves a truncated settings file behind
+            tmp_file = self.settings_file.with_name(self.settings_file.name + ".tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.settings_file)
+            self._saved_digest = digest
             
             logger.info(f"Settings saved to {self.settings_file}")
             return True
@@ -151,6 +336,50 @@ class AdvancedSettingsManager:
             logger.error(f"Error saving settings: {e}")
             return False
     
+    def _request_save(self, defer: bool = False):
+        """
+        Save the settings now, or within SAVE_DELAY when deferred.
+        
+        Deferred changes within SAVE_DELAY are written together; a save now
+        also writes any deferred one.
+        """
+        with self._save_lock:
+            if not self._save_pending:
+                atexit.register(self.flush)
+            self._save_pending = True
+            if defer:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(SAVE_DELAY, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Write any pending save now.
+        
+        Returns:
+            True if nothing was pending or the save succeeded, False otherwise
+        """
+        with self._save_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._save_pending:
+                return True
+            saved = self.save_settings()
+            # A failed save stays pending, and registered, for the next flush
+            self._save_pending = not saved
+            if saved:
+                atexit.unregister(self.flush)
+            return saved
+    
+    def close(self):
+        """Flush pending changes; the manager should not be used afterwards."""
+        if not self.flush():
+            atexit.unregister(self.flush)
+    
     def get_setting(self, key_path: str, default: Any = None) -> Any:
         """
         Get a setting value using dot notation.
@@ -160,25 +389,30 @@ class AdvancedSettingsManager:
             default: Default value if setting not found
             
         Returns:
-            Setting value or default
+            Setting value or default. Lists and sections are returned as
+            copies; change them through set_setting or update_settings.
         """
         try:
-            keys = key_path.split('.')
-            value = self.settings
-            
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
+            # Sample the tree once; a concurrent write swaps in a new one
+            root = self.settings
+            view_root, flat = self._flat_view
+            if view_root is not root:
+                flat = self._rebuild_config_cache(root)
+            value = flat.get(key_path, _MISSING)
+            if value is _MISSING:
+                # Sections and absent paths are not in the flat map; walk the tree
+                value = _walk(root, key_path, _MISSING)
+                if value is _MISSING:
                     return default
             
-            return value
+            return _detached(value)
             
         except Exception as e:
             logger.error(f"Error getting setting {key_path}: {e}")
             return default
     
-    def set_setting(self, key_path: str, value: Any, save: bool = True) -> bool:
+    def set_setting(self, key_path: str, value: Any,
+                    save: bool = True, defer: bool = False) -> bool:
         """
         Set a setting value using dot notation.
         
@@ -186,31 +420,23 @@ class AdvancedSettingsManager:
             key_path: Dot-separated path to the setting
             value: Value to set
             save: Whether to save settings to file immediately
+            defer: Save within SAVE_DELAY from a background timer instead of
+                before returning, so a burst of changes is written once
             
         Returns:
             True if setting was set successfully, False otherwise
         """
         try:
-            keys = key_path.split('.')
-            current = self.settings
-            
-            # Navigate to the parent of the target key
-            for key in keys[:-1]:
-                if key not in current:
-                    current[key] = {}
-                current = current[key]
+            self._assign(key_path, value)
             
-            # Set the value
-            current[keys[-1]] = value
-            
-            # Validate the new settings
-            if not self._validate_settings():
+            # Validate only what this write can have changed
+            if not self._validate_paths((key_path,)):
                 logger.error(f"Invalid value for setting {key_path}: {value}")
                 return False
             
             # Save if requested
             if save:
-                self.save_settings()
+                self._request_save(defer)
             
             logger.info(f"Setting {key_path} updated to: {value}")
             return True
@@ -219,26 +445,69 @@ class AdvancedSettingsManager:
             logger.error(f"Error setting {key_path}: {e}")
             return False
     
-    def update_settings(self, updates: Dict[str, Any], save: bool = True) -> bool:
+    def _assign(self, key_path: str, value: Any):
+        """Write a setting, creating parent sections; no validation or save."""
+        keys = _split_path(key_path)
+        root = current = dict(self.settings)
+        
+        # Copy each section on the way down to the parent of the target key
+        for key in keys[:-1]:
+            current = _copy_child(current, key)
+        
+        # Set the value and publish the new tree
+        current[keys[-1]] = value
+        self.settings = root
+    
+    def _assign_many(self, updates: Dict[str, Any]):
+        """Write several settings in one new tree, copying each section on the way once."""
+        root = dict(self.settings)
+        # Split path prefix -> that section's copy in the new tree
+        sections: Dict[Tuple[str, ...], Dict[str, Any]] = {(): root}
+        
+        for key_path, value in updates.items():
+            keys = _split_path(key_path)
+            current = root
+            for depth in range(1, len(keys)):
+                section = sections.get(keys[:depth])
+                if section is None:
+                    section = _copy_child(current, keys[depth - 1])
+                    sections[keys[:depth]] = section
+                current = section
+            
+            leaf = keys[-1]
+            if isinstance(value, dict) or isinstance(current.get(leaf), dict):
+                # A section is being replaced; copies cached beneath it are detached
+                sections = {(): root}
+            current[leaf] = value
+            logger.info(f"Setting {key_path} updated to: {value}")
+        
+        self.settings = root
+    
+    def update_settings(self, updates: Dict[str, Any],
+                        save: bool = True, defer: bool = False) -> bool:
         """
         Update multiple settings at once.
         
         Args:
             updates: Dictionary of setting paths and values
             save: Whether to save settings to file immediately
+            defer: Save within SAVE_DELAY from a background timer instead of
+                before returning, so a burst of changes is written once
             
         Returns:
             True if all settings updated successfully, False otherwise
         """
         try:
-            # Apply all updates
-            for key_path, value in updates.items():
-                if not self.set_setting(key_path, value, save=False):
-                    return False
+            # Apply all updates, then validate once
+            self._assign_many(updates)
+            
+            if not self._validate_paths(updates):
+                logger.error(f"Invalid settings update: {updates}")
+                return False
             
             # Save if requested
             if save:
-                self.save_settings()
+                self._request_save(defer)
             
             return True
             
@@ -246,13 +515,16 @@ class AdvancedSettingsManager:
             logger.error(f"Error updating settings: {e}")
             return False
     
-    def reset_to_defaults(self, section: Optional[str] = None, save: bool = True) -> bool:
+    def reset_to_defaults(self, section: Optional[str] = None,
+                          save: bool = True, defer: bool = False) -> bool:
         """
         Reset settings to defaults.
         
         Args:
             section: Specific section to reset (None for all)
             save: Whether to save settings to file immediately
+            defer: Save within SAVE_DELAY from a background timer instead of
+                before returning, so a burst of changes is written once
             
         Returns:
             True if reset successful, False otherwise
@@ -260,17 +532,19 @@ class AdvancedSettingsManager:
         try:
             if section:
                 if section in self.default_settings:
-                    self.settings[section] = self.default_settings[section].copy()
+                    settings = dict(self.settings)
+                    settings[section] = _default_settings()[section]
+                    self.settings = settings
                     logger.info(f"Reset {section} settings to defaults")
                 else:
                     logger.error(f"Unknown settings section: {section}")
                     return False
             else:
-                self.settings = self.default_settings.copy()
+                self.settings = _default_settings()
                 logger.info("Reset all settings to defaults")
             
             if save:
-                self.save_settings()
+                self._request_save(defer)
             
             return True
             
@@ -280,7 +554,7 @@ class AdvancedSettingsManager:
     
     def get_all_settings(self) -> Dict[str, Any]:
         """Get a copy of all current settings."""
-        return self.settings.copy()
+        return copy.deepcopy(self.settings)
     
     def export_settings(self, export_path: str) -> bool:
         """
@@ -294,8 +568,8 @@ class AdvancedSettingsManager:
         """
         try:
             export_file = Path(export_path)
-            with open(export_file, 'w') as f:
-                json.dump(self.settings, f, indent=2, sort_keys=True)
+            with open(export_file, 'wb') as f:
+                f.write(_dumps(self.settings))
             
             logger.info(f"Settings exported to {export_file}")
             return True
@@ -304,13 +578,16 @@ class AdvancedSettingsManager:
             logger.error(f"Error exporting settings: {e}")
             return False
     
-    def import_settings(self, import_path: str, save: bool = True) -> bool:
+    def import_settings(self, import_path: str,
+                        save: bool = True, defer: bool = False) -> bool:
         """
         Import settings from a file.
         
         Args:
             import_path: Path to import file
             save: Whether to save imported settings
+            defer: Save within SAVE_DELAY from a background timer instead of
+                before returning, so a burst of changes is written once
             
         Returns:
             True if import successful, False otherwise
@@ -321,11 +598,13 @@ class AdvancedSettingsManager:
                 logger.error(f"Import file not found: {import_file}")
                 return False
             
-            with open(import_file, 'r') as f:
-                imported_settings = json.load(f)
+            with open(import_file, 'rb') as f:
+                imported_settings = _loads(f.read())
             
-            # Merge with current settings
-            self._merge_settings(self.settings, imported_settings)
+            # Merge into a copy of the current settings, then swap it in
+            settings = dict(self.settings)
+            self._merge_settings(settings, imported_settings)
+            self.settings = settings
             
             # Validate
             if not self._validate_settings():
@@ -333,7 +612,7 @@ class AdvancedSettingsManager:
                 return False
             
             if save:
-                self.save_settings()
+                self._request_save(defer)
             
             logger.info(f"Settings imported from {import_file}")
             return True
@@ -343,37 +622,36 @@ class AdvancedSettingsManager:
             return False
     
     def _load_from_environment(self):
-        """Load settings from environment variables."""
-        env_mappings = {
-            "MATRIX_HOMESERVER": "matrix.homeserver",
-            "MATRIX_USERNAME": "matrix.username",
-            "MATRIX_SYNC_TIMEOUT": "matrix.sync_timeout",
-            "MATRIX_REQUEST_TIMEOUT": "matrix.request_timeout",
-            "MATRIX_KEEPALIVE_INTERVAL": "matrix.keepalive_interval",
-            "EMULATOR_PERSONALITY": "emulator.personality",
-            "EMULATOR_LOG_LEVEL": "emulator.log_level",
-            "EMULATOR_KNOWLEDGE_FILE": "emulator.knowledge_file"
-        }
-        
-        for env_var, setting_path in env_mappings.items():
-            value = os.getenv(env_var)
-            if value is not None:
-                # Convert numeric values
-                if setting_path.endswith(('timeout', 'interval')):
-                    try:
-                        value = int(value)
-                    except ValueError:
-                        continue
-                
-                self.set_setting(setting_path, value, save=False)
+        """Load settings from environment variables; the caller validates afterwards."""
+        environ = os.environ
+        for env_var, setting_path, cast in _ENV_MAPPINGS:
+            value = environ.get(env_var)
+            if value is None:
+                continue
+            try:
+                value = cast(value)
+            except ValueError:
+                continue
+            
+            self._assign(setting_path, value)
     
     def _merge_settings(self, target: Dict[str, Any], source: Dict[str, Any]):
-        """Recursively merge source settings into target."""
-        for key, value in source.items():
-            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                self._merge_settings(target[key], value)
-            else:
-                target[key] = value
+        """
+        Merge source settings into target, descending into nested sections.
+        
+        Sections of target that are merged into are copied first, so target
+        may be a shallow copy sharing them with the live settings tree.
+        """
+        # Explicit stack instead of recursion: one frame however deep the sections go
+        stack = [(target, source)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((_copy_child(target, key), value))
+                else:
+                    target[key] = value
     
     def _validate_settings(self) -> bool:
         """
@@ -382,34 +660,33 @@ class AdvancedSettingsManager:
         Returns:
             True if settings are valid, False otherwise
         """
+        return self._validate_paths(None)
+    
+    def _validate_paths(self, key_paths: Optional[Iterable[str]]) -> bool:
+        """
+        Run the validators affected by writes to the given paths.
+        
+        A validator is affected when its path equals a written path, lies
+        inside a written section, or contains a written path.
+        
+        Args:
+            key_paths: Written setting paths, or None to run every validator
+            
+        Returns:
+            True if validation ran, False if it raised
+        """
         try:
-            # Validate emulator settings
-            personality = self.get_setting("emulator.personality")
-            if personality not in ["curious_researcher", "creative_assistant", "wise_mentor"]:
-                logger.warning(f"Invalid personality: {personality}")
-            
-            # Validate Matrix settings
-            homeserver = self.get_setting("matrix.homeserver")
-            if not homeserver or not homeserver.startswith(("http://", "https://")):
-                logger.warning(f"Invalid homeserver URL: {homeserver}")
-            
-            username = self.get_setting("matrix.username")
-            if not username or not username.startswith("@"):
-                logger.warning(f"Invalid Matrix username: {username}")
-            
-            # Validate numeric settings
-            numeric_settings = [
-                "matrix.sync_timeout",
-                "matrix.request_timeout", 
-                "matrix.keepalive_interval",
-                "emulator.max_context_length",
-                "emulator.response_timeout"
-            ]
-            
-            for setting in numeric_settings:
-                value = self.get_setting(setting)
-                if not isinstance(value, (int, float)) or value <= 0:
-                    logger.warning(f"Invalid numeric setting {setting}: {value}")
+            for path, (check, warning) in _VALIDATORS.items():
+                if key_paths is not None and not any(
+                    path == key_path
+                    or path.startswith(key_path + ".")
+                    or key_path.startswith(path + ".")
+                    for key_path in key_paths
+                ):
+                    continue
+                value = self.get_setting(path)
+                if not check(value):
+                    logger.warning(warning.format(path=path, value=value))
             
             return True
             
@@ -420,64 +697,129 @@ class AdvancedSettingsManager:
     def _create_backup(self):
         """Create a backup of current settings file."""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = self.backup_dir / f"settings_backup_{timestamp}.json"
+            # Nanosecond stamp: unique even for bursts of saves, and zero-padded to sort
+            backup_file = self.backup_dir / f"settings_backup_{time.time_ns():020d}.json"
             
-            # Copy current settings file to backup
-            import shutil
-            shutil.copy2(self.settings_file, backup_file)
+            # Saves replace the file rather than rewrite it, so a hard link
+            # preserves the current version without copying any data
+            try:
+                os.link(self.settings_file, backup_file)
+            except OSError:
+                # Filesystem without hard links
+                shutil.copy2(self.settings_file, backup_file)
             
             logger.info(f"Settings backup created: {backup_file}")
             
-            # Clean up old backups (keep last 10)
-            backups = sorted(self.backup_dir.glob("settings_backup_*.json"))
-            if len(backups) > 10:
-                for old_backup in backups[:-10]:
-                    old_backup.unlink()
-                    logger.debug(f"Removed old backup: {old_backup}")
+            # Clean up old backups (keep the last BACKUP_LIMIT)
+            backups = self._backups
+            backups.append(backup_file)
+            while len(backups) > BACKUP_LIMIT:
+                old_backup = backups.popleft()
+                old_backup.unlink(missing_ok=True)
+                logger.debug(f"Removed old backup: {old_backup}")
             
         except Exception as e:
             logger.error(f"Error creating settings backup: {e}")
     
+    def _rebuild_config_cache(self, root: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rebuild the flat leaf map, config dicts and membership sets from a tree.
+        
+        Args:
+            root: Settings tree sampled by the caller
+            
+        Returns:
+            The flat leaf map for root
+        """
+        flat: Dict[str, Any] = {}
+        stack: List[Tuple[str, Dict[str, Any]]] = [("", root)]
+        while stack:
+            prefix, section = stack.pop()
+            for key, value in section.items():
+                if '.' in key:
+                    # Unreachable through a dotted path; leave it to the tree walk
+                    continue
+                if isinstance(value, dict):
+                    stack.append((f"{prefix}{key}.", value))
+                else:
+                    flat[prefix + key] = value
+        
+        def lookup(key_path: str, default: Any = None) -> Any:
+            value = flat.get(key_path, _MISSING)
+            return _walk(root, key_path, default) if value is _MISSING else value
+        
+        self._config_cache = {
+            "matrix": {
+                "homeserver": lookup("matrix.homeserver"),
+                "username": lookup("matrix.username"),
+                "sync_timeout": lookup("matrix.sync_timeout"),
+                "request_timeout": lookup("matrix.request_timeout"),
+                "keepalive_interval": lookup("matrix.keepalive_interval"),
+                "auto_join_rooms": lookup("matrix.auto_join_rooms"),
+                "authorized_users": lookup("matrix.authorized_users", [])
+            },
+            "emulator": {
+                "personality": lookup("emulator.personality"),
+                "log_level": lookup("emulator.log_level"),
+                "knowledge_file": lookup("emulator.knowledge_file"),
+                "max_context_length": lookup("emulator.max_context_length"),
+                "response_timeout": lookup("emulator.response_timeout")
+            }
+        }
+        self._authorized_users_set = frozenset(lookup("matrix.authorized_users", []))
+        self._blocked_users_set = frozenset(lookup("security.blocked_users", []))
+        self._allowed_commands_set = frozenset(lookup("security.allowed_commands", []))
+        
+        # Published last, as one assignment, once everything above matches root
+        self._flat_view = (root, flat)
+        return flat
+    
+    def _refresh_derived(self):
+        """Rebuild the derived views if the settings tree has changed since."""
+        root = self.settings
+        if self._flat_view[0] is not root:
+            self._rebuild_config_cache(root)
+    
     def get_matrix_config(self) -> Dict[str, Any]:
         """Get Matrix-specific configuration."""
-        return {
-            "homeserver": self.get_setting("matrix.homeserver"),
-            "username": self.get_setting("matrix.username"),
-            "sync_timeout": self.get_setting("matrix.sync_timeout"),
-            "request_timeout": self.get_setting("matrix.request_timeout"),
-            "keepalive_interval": self.get_setting("matrix.keepalive_interval"),
-            "auto_join_rooms": self.get_setting("matrix.auto_join_rooms"),
-            "authorized_users": self.get_setting("matrix.authorized_users", [])
-        }
+        self._refresh_derived()
+        return _detached(self._config_cache["matrix"])
     
     def get_emulator_config(self) -> Dict[str, Any]:
         """Get Emulator-specific configuration."""
-        return {
-            "personality": self.get_setting("emulator.personality"),
-            "log_level": self.get_setting("emulator.log_level"),
-            "knowledge_file": self.get_setting("emulator.knowledge_file"),
-            "max_context_length": self.get_setting("emulator.max_context_length"),
-            "response_timeout": self.get_setting("emulator.response_timeout")
-        }
+        self._refresh_derived()
+        return _detached(self._config_cache["emulator"])
     
     def is_user_authorized(self, user_id: str) -> bool:
         """Check if a user is authorized for system commands."""
-        authorized_users = self.get_setting("matrix.authorized_users", [])
-        return user_id in authorized_users
+        self._refresh_derived()
+        return user_id in self._authorized_users_set
+    
+    def is_user_blocked(self, user_id: str) -> bool:
+        """Check if a user is on the blocked users list."""
+        self._refresh_derived()
+        return user_id in self._blocked_users_set
+    
+    def is_command_allowed(self, command: str) -> bool:
+        """Check if a command is on the allowed commands list."""
+        self._refresh_derived()
+        return command in self._allowed_commands_set
     
-    def add_authorized_user(self, user_id: str, save: bool = True) -> bool:
+    def add_authorized_user(self, user_id: str,
+                            save: bool = True, defer: bool = False) -> bool:
         """Add a user to the authorized users list."""
+        # get_setting returns a copy, so the list can be changed and stored back
         authorized_users = self.get_setting("matrix.authorized_users", [])
         if user_id not in authorized_users:
             authorized_users.append(user_id)
-            return self.set_setting("matrix.authorized_users", authorized_users, save)
+            return self.set_setting("matrix.authorized_users", authorized_users, save, defer)
         return True
     
-    def remove_authorized_user(self, user_id: str, save: bool = True) -> bool:
+    def remove_authorized_user(self, user_id: str,
+                               save: bool = True, defer: bool = False) -> bool:
         """Remove a user from the authorized users list."""
         authorized_users = self.get_setting("matrix.authorized_users", [])
         if user_id in authorized_users:
             authorized_users.remove(user_id)
-            return self.set_setting("matrix.authorized_users", authorized_users, save)
+            return self.set_setting("matrix.authorized_users", authorized_users, save, defer)
         return True
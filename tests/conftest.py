@@ -0,0 +1,11 @@
+"""
+Shared pytest setup for The Emulator tests.
+
+The package lives under src/ and is not installed, so the tests import it
+from there, the same way the examples and run_matrix_bot.py do.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
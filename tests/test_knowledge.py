@@ -0,0 +1,199 @@
+"""
+Tests for the knowledge store: the column-wise snapshot and the JSONL
+interaction log written by a background thread.
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from emulator import knowledge
+from emulator.knowledge import KnowledgeManager, _InteractionLog
+
+
+def _log_lines(path):
+    """Non-blank lines of a JSONL file, parsed."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _writer_threads():
+    return [t for t in threading.enumerate() if t.name == "knowledge-writer"]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    km = KnowledgeManager(str(tmp_path / "kb.json"))
+    yield km
+    km.close()
+
+
+class TestInteractionLog:
+    """The background JSONL writer."""
+
+    def test_interactions_are_appended_to_the_log(self, manager):
+        for i in range(3):
+            manager.store_interaction(f"prompt {i}", f"response {i}", "curiosity")
+        manager.flush()
+
+        lines = _log_lines(manager.interactions_file)
+        assert [line["prompt"] for line in lines] == ["prompt 0", "prompt 1", "prompt 2"]
+        assert manager.get_interaction_count() == 3
+
+    def test_snapshot_does_not_carry_interactions(self, manager):
+        manager.store_interaction("hello", "hi", "joy")
+        manager.store_knowledge("color", "blue")
+        manager.flush()
+
+        with open(manager.knowledge_file, encoding="utf-8") as f:
+            assert "interactions" not in json.load(f)
+
+    def test_log_is_compacted_to_its_tail(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(knowledge, "_LOG_COMPACT_LINES", 5)
+        monkeypatch.setattr(knowledge, "_INTERACTION_LIMIT", 3)
+        km = KnowledgeManager(str(tmp_path / "kb.json"))
+        try:
+            for i in range(12):
+                km.store_interaction(f"p{i}", "r", "e")
+            km.flush()
+
+            lines = _log_lines(km.interactions_file)
+            assert len(lines) < 12
+            assert [line["prompt"] for line in lines[-3:]] == ["p9", "p10", "p11"]
+        finally:
+            km.close()
+
+        reloaded = KnowledgeManager(str(tmp_path / "kb.json"))
+        try:
+            assert [i["prompt"] for i in reloaded.interactions] == ["p9", "p10", "p11"]
+        finally:
+            reloaded.close()
+
+    def test_legacy_snapshot_is_migrated(self, tmp_path):
+        path = tmp_path / "kb.json"
+        path.write_text(json.dumps({
+            "knowledge": {
+                "color": {"value": "blue", "timestamp": "2025-09-26T01:10:39", "type": "str"}
+            },
+            "interactions": [
+                {"prompt": "old", "response": "r", "emotion": "e", "timestamp": "t"}
+            ],
+        }), encoding="utf-8")
+
+        km = KnowledgeManager(str(path))
+        try:
+            assert km.retrieve_knowledge("color") == "blue"
+            assert [i["prompt"] for i in km.interactions] == ["old"]
+            # Interactions move into the log, so the next snapshot cannot drop them
+            assert [i["prompt"] for i in _log_lines(km.interactions_file)] == ["old"]
+
+            km.store_knowledge("shape", "round")
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            assert data["values"] == {"color": "blue", "shape": "round"}
+            assert "knowledge" not in data and "interactions" not in data
+        finally:
+            km.close()
+
+    def test_torn_last_line_is_skipped_and_terminated(self, tmp_path):
+        path = tmp_path / "kb.json"
+        log = tmp_path / "kb_interactions.jsonl"
+        log.write_text('{"prompt": "whole", "response": "r", "emotion": "e"}\n{"prompt": "to',
+                       encoding="utf-8")
+
+        km = KnowledgeManager(str(path))
+        assert [i["prompt"] for i in km.interactions] == ["whole"]
+        km.store_interaction("after", "r", "e")
+        km.close()
+
+        reloaded = KnowledgeManager(str(path))
+        try:
+            assert [i["prompt"] for i in reloaded.interactions] == ["whole", "after"]
+        finally:
+            reloaded.close()
+
+    def test_writer_starts_on_first_interaction(self, tmp_path):
+        before = len(_writer_threads())
+        km = KnowledgeManager(str(tmp_path / "kb.json"))
+        try:
+            assert len(_writer_threads()) == before
+            assert list(tmp_path.iterdir()) == []
+
+            km.store_interaction("hello", "hi", "joy")
+            assert len(_writer_threads()) == before + 1
+        finally:
+            km.close()
+        assert len(_writer_threads()) == before
+
+    def test_close_drains_the_queue_and_later_writes_are_inline(self, tmp_path):
+        path = str(tmp_path / "log.jsonl")
+        log = _InteractionLog(path)
+        for i in range(100):
+            log.put({"prompt": f"p{i}"})
+        log.close()
+
+        assert log.pending.empty()
+        assert len(_log_lines(path)) == 100
+
+        log.put({"prompt": "late"})
+        assert _log_lines(path)[-1] == {"prompt": "late"}
+        # A second close is a no-op
+        log.close()
+
+
+class TestKnowledgeStore:
+    """The column-wise knowledge snapshot."""
+
+    def test_snapshot_is_stored_column_wise(self, manager):
+        manager.store_knowledge("color", "blue")
+        manager.store_knowledge("languages", ["Python", "Rust"])
+
+        with open(manager.knowledge_file, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["values"] == {"color": "blue", "languages": ["Python", "Rust"]}
+        assert data["types"] == {"color": "str", "languages": "list"}
+        assert set(data["timestamps"]) == {"color", "languages"}
+
+    def test_knowledge_base_is_a_read_only_view(self, manager):
+        manager.store_knowledge("color", "blue")
+        kb = manager.knowledge_base
+
+        assert kb["color"]["value"] == "blue"
+        assert kb["color"]["type"] == "str"
+        with pytest.raises(TypeError):
+            kb["shape"] = {"value": "round"}
+        with pytest.raises(TypeError):
+            kb["color"]["value"] = "red"
+        assert manager.retrieve_knowledge("color") == "blue"
+
+    def test_unchanged_store_skips_the_snapshot(self, manager):
+        manager.store_knowledge("color", "blue")
+        snapshot = manager.knowledge_file
+
+        # An identical immutable value leaves the store clean, so nothing is rewritten
+        os.remove(snapshot)
+        assert manager.store_knowledge("color", "blue")
+        assert not os.path.exists(snapshot)
+
+        manager.store_knowledge("color", "red")
+        assert os.path.exists(snapshot)
+
+    def test_batch_writes_one_snapshot(self, manager, monkeypatch):
+        writes = []
+        real_save = manager._save_knowledge
+        monkeypatch.setattr(manager, "_save_knowledge", lambda: (writes.append(1), real_save()))
+
+        with manager.batch():
+            for i in range(10):
+                manager.store_knowledge(f"k{i}", i)
+
+        assert len(writes) == 1
+        reloaded = KnowledgeManager(manager.knowledge_file)
+        assert reloaded.get_knowledge_count() == 10
+        reloaded.close()
+
+    def test_snapshot_write_leaves_no_temporary_file(self, manager, tmp_path):
+        manager.store_knowledge("color", "blue")
+        assert not (tmp_path / "kb.json.tmp").exists()
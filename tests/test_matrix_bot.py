@@ -0,0 +1,197 @@
+"""
+Tests for the Matrix bot's incoming event queue and outgoing send queue.
+
+matrix-nio and psutil are optional at test time, so the fixture installs
+minimal stand-ins for them before importing the bot module.
+"""
+
+import asyncio
+import importlib
+import sys
+import types
+
+import pytest
+
+_NIO_NAMES = (
+    "AsyncClient", "AsyncClientConfig", "LoginResponse", "RoomMessageText",
+    "InviteMemberEvent", "MatrixRoom", "JoinResponse", "SyncResponse",
+)
+
+BOT_ID = "@emulator-bot:example.org"
+
+
+class FakeEmulator:
+    """Deterministic stand-in for AdvancedLLMEmulator."""
+
+    def __init__(self, name="fake"):
+        self.name = name
+        self.prompts = []
+
+    def get_decision(self, prompt):
+        self.prompts.append(prompt)
+        return f"echo {prompt}"
+
+    def get_capabilities(self):
+        return {"reasoning": True}
+
+    def get_personality_info(self):
+        return {"personality": self.name, "emotional_state": {}}
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    """Records room_send calls in order."""
+
+    user_id = BOT_ID
+
+    def __init__(self):
+        self.sent = []
+
+    async def room_send(self, room_id, message_type, content):
+        self.sent.append((room_id, content["body"]))
+
+
+@pytest.fixture
+def bot_module(monkeypatch):
+    nio = types.ModuleType("nio")
+    for name in _NIO_NAMES:
+        setattr(nio, name, type(name, (), {}))
+    psutil = types.ModuleType("psutil")
+    psutil.cpu_percent = lambda interval=None: 0.0
+
+    monkeypatch.setitem(sys.modules, "nio", nio)
+    monkeypatch.setitem(sys.modules, "psutil", psutil)
+    sys.modules.pop("emulator.matrix_bot", None)
+    module = importlib.import_module("emulator.matrix_bot")
+    yield module
+    # Do not leave a module bound to the stand-ins for later imports
+    sys.modules.pop("emulator.matrix_bot", None)
+
+
+@pytest.fixture
+def bot(bot_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bot = bot_module.EmulatorMatrixBot(
+        "https://matrix.example.org", BOT_ID, "password",
+        context_file=str(tmp_path / "context.json"),
+        sync_token_file=str(tmp_path / "next_batch"),
+    )
+    bot.emulator = FakeEmulator()
+    bot.client = FakeClient()
+    yield bot
+    bot._executor.shutdown(wait=True)
+
+
+def _event(event_id, body, sender="@alice:example.org"):
+    return types.SimpleNamespace(event_id=event_id, body=body, sender=sender)
+
+
+def _room(room_id):
+    return types.SimpleNamespace(room_id=room_id)
+
+
+async def _run_queues(bot, bot_module, feed):
+    """Start the workers and send flusher the way start() does, feed events, then drain."""
+    bot._send_queue = asyncio.Queue()
+    bot._send_sem = asyncio.Semaphore(bot_module.SEND_CONCURRENCY)
+    bot._event_queue = asyncio.Queue()
+    tasks = [asyncio.create_task(bot._send_flusher())]
+    tasks.extend(asyncio.create_task(bot._event_worker()) for _ in range(bot_module.EVENT_WORKERS))
+    try:
+        await feed()
+        await bot._event_queue.join()
+        # Let the flusher pick up what the workers queued and send it
+        while not bot._send_queue.empty():
+            await asyncio.sleep(bot_module.SEND_BATCH_WINDOW)
+        await asyncio.sleep(bot_module.SEND_BATCH_WINDOW * 2)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TestEventQueue:
+    """Incoming messages are queued and handled by worker tasks."""
+
+    def test_replies_keep_arrival_order_per_room(self, bot, bot_module):
+        async def feed():
+            for i in range(5):
+                for room_id in ("!a:example.org", "!b:example.org"):
+                    event = _event(f"{room_id}-{i}", f"emulator msg {i}")
+                    await bot._handle_message(_room(room_id), event)
+
+        asyncio.run(_run_queues(bot, bot_module, feed))
+
+        for room_id in ("!a:example.org", "!b:example.org"):
+            replies = [body for sent_room, body in bot.client.sent if sent_room == room_id]
+            assert replies == [f"echo msg {i}" for i in range(5)]
+
+    def test_duplicate_own_and_unaddressed_messages_are_dropped(self, bot, bot_module):
+        async def feed():
+            room = _room("!a:example.org")
+            await bot._handle_message(room, _event("$1", "emulator hello"))
+            await bot._handle_message(room, _event("$1", "emulator hello"))
+            await bot._handle_message(room, _event("$2", "emulator it's me", sender=BOT_ID))
+            await bot._handle_message(room, _event("$3", "just chatting"))
+
+        asyncio.run(_run_queues(bot, bot_module, feed))
+
+        assert bot.client.sent == [("!a:example.org", "echo hello")]
+        assert bot.emulator.prompts == ["hello"]
+
+    def test_context_records_both_sides(self, bot, bot_module):
+        async def feed():
+            await bot._handle_message(_room("!a:example.org"), _event("$1", "emulator hello"))
+
+        asyncio.run(_run_queues(bot, bot_module, feed))
+
+        assert bot.conversation_context["!a:example.org"] == ("User: hello", "Emulator: echo hello")
+
+
+class TestSendQueue:
+    """Outgoing messages are coalesced and sent per room in order."""
+
+    def test_burst_is_sent_in_order_per_room(self, bot, bot_module):
+        async def feed():
+            for i in range(10):
+                await bot._send_message("!a:example.org", f"a{i}")
+                await bot._send_message("!b:example.org", f"b{i}")
+
+        asyncio.run(_run_queues(bot, bot_module, feed))
+
+        for room_id, prefix in (("!a:example.org", "a"), ("!b:example.org", "b")):
+            sent = [body for room, body in bot.client.sent if room == room_id]
+            assert sent == [f"{prefix}{i}" for i in range(10)]
+
+    def test_messages_are_sent_directly_before_the_queue_runs(self, bot):
+        asyncio.run(bot._send_message("!a:example.org", "hello"))
+        assert bot.client.sent == [("!a:example.org", "hello")]
+
+
+class TestCommands:
+    """Command replies and authorization."""
+
+    def test_command_reply_uses_real_newlines(self, bot):
+        reply = asyncio.run(bot._handle_action_command("tidy up"))
+        assert "\\n" not in reply
+        assert "\n\n🧠 **AI Response:** echo Execute this action: tidy up\n\n" in reply
+
+    def test_empty_authorized_users_fall_back_to_defaults(self, bot_module, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        bot = bot_module.EmulatorMatrixBot("https://matrix.example.org", BOT_ID, "password",
+                                           authorized_users=set())
+        try:
+            assert bot.authorized_users == set(bot_module._DEFAULT_AUTHORIZED_USERS)
+            # Still a mutable set, so users can be added at runtime
+            bot.authorized_users.add("@carol:example.org")
+            assert "@carol:example.org" in bot.authorized_users
+            assert "@carol:example.org" not in bot_module._DEFAULT_AUTHORIZED_USERS
+        finally:
+            bot._executor.shutdown(wait=True)
+
+    def test_replacing_the_emulator_drops_cached_metadata(self, bot):
+        assert bot._personality()["personality"] == "fake"
+        bot.emulator = FakeEmulator("replacement")
+        assert bot._personality()["personality"] == "replacement"
@@ -0,0 +1,179 @@
+"""
+Tests for AdvancedSettingsManager persistence and its copy-on-write settings tree.
+"""
+
+import json
+import time
+
+import pytest
+
+from emulator import settings_manager
+from emulator.settings_manager import AdvancedSettingsManager
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _backups(manager):
+    return sorted(manager.backup_dir.glob("settings_backup_*.json"))
+
+
+@pytest.fixture(autouse=True)
+def _no_env_overrides(monkeypatch):
+    """Keep the defaults the tests expect, whatever the environment sets."""
+    for env_var, _, _ in settings_manager._ENV_MAPPINGS:
+        monkeypatch.delenv(env_var, raising=False)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    m = AdvancedSettingsManager(str(tmp_path / "settings.json"), str(tmp_path / "backups"))
+    yield m
+    m.close()
+
+
+class TestSaving:
+    """When and how settings reach the file."""
+
+    def test_save_is_synchronous_by_default(self, manager):
+        assert manager.set_setting("matrix.sync_timeout", 123)
+        assert _read(manager.settings_file)["matrix"]["sync_timeout"] == 123
+
+    def test_deferred_saves_are_coalesced(self, manager, monkeypatch):
+        monkeypatch.setattr(settings_manager, "SAVE_DELAY", 0.05)
+        for value in (1000, 2000, 3000):
+            manager.set_setting("matrix.sync_timeout", value, defer=True)
+        assert not manager.settings_file.exists()
+
+        deadline = time.monotonic() + 5
+        while not manager.settings_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _read(manager.settings_file)["matrix"]["sync_timeout"] == 3000
+
+    def test_flush_writes_a_pending_deferred_save(self, manager):
+        manager.set_setting("matrix.sync_timeout", 456, defer=True)
+        assert manager.flush()
+        assert _read(manager.settings_file)["matrix"]["sync_timeout"] == 456
+
+    def test_synchronous_save_takes_a_pending_deferred_one_along(self, manager):
+        manager.set_setting("matrix.sync_timeout", 1, defer=True)
+        manager.set_setting("matrix.request_timeout", 2)
+
+        data = _read(manager.settings_file)
+        assert (data["matrix"]["sync_timeout"], data["matrix"]["request_timeout"]) == (1, 2)
+        assert manager._flush_timer is None
+
+    def test_save_false_does_not_write(self, manager):
+        manager.set_setting("matrix.sync_timeout", 789, save=False)
+        assert not manager.settings_file.exists()
+
+    def test_save_is_atomic(self, manager, monkeypatch):
+        manager.set_setting("matrix.sync_timeout", 1)
+        tmp_file = manager.settings_file.with_name(manager.settings_file.name + ".tmp")
+        assert not tmp_file.exists()
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(settings_manager.os, "replace", fail)
+        manager.set_setting("matrix.sync_timeout", 2, save=False)
+        assert not manager.save_settings(create_backup=False)
+        # The previous file is left whole
+        assert _read(manager.settings_file)["matrix"]["sync_timeout"] == 1
+
+    def test_unchanged_settings_are_not_rewritten(self, manager):
+        manager.set_setting("matrix.sync_timeout", 1)
+        manager.set_setting("matrix.sync_timeout", 2)
+        backups = _backups(manager)
+        mtime = manager.settings_file.stat().st_mtime_ns
+
+        assert manager.save_settings()
+        assert _backups(manager) == backups
+        assert manager.settings_file.stat().st_mtime_ns == mtime
+
+    def test_reloaded_settings_are_not_rewritten(self, manager):
+        manager.set_setting("matrix.sync_timeout", 1)
+        reloaded = AdvancedSettingsManager(str(manager.settings_file), str(manager.backup_dir))
+        backups = _backups(reloaded)
+
+        assert reloaded.save_settings()
+        assert _backups(reloaded) == backups
+        reloaded.close()
+
+
+class TestBackups:
+    """Backups made before each save."""
+
+    def test_backups_are_pruned_to_the_limit(self, manager, monkeypatch):
+        monkeypatch.setattr(settings_manager, "BACKUP_LIMIT", 3)
+        for value in range(8):
+            manager.set_setting("matrix.sync_timeout", 1000 + value)
+
+        backups = _backups(manager)
+        assert len(backups) == 3
+        # The newest backup holds the version before the last save
+        assert _read(backups[-1])["matrix"]["sync_timeout"] == 1006
+
+    def test_pruning_covers_backups_from_earlier_runs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings_manager, "BACKUP_LIMIT", 2)
+        backup_dir = tmp_path / "backups"
+        backup_dir.mkdir()
+        # Older releases named backups by date and time
+        old = backup_dir / "settings_backup_20250101_000000.json"
+        old.write_text("{}", encoding="utf-8")
+
+        m = AdvancedSettingsManager(str(tmp_path / "settings.json"), str(backup_dir))
+        try:
+            for value in range(3):
+                m.set_setting("matrix.sync_timeout", 1000 + value)
+            assert not old.exists()
+            assert len(_backups(m)) == 2
+        finally:
+            m.close()
+
+
+class TestCopyOnWrite:
+    """Readers see whole trees, and the flat read cache follows every change."""
+
+    def test_reads_follow_writes(self, manager):
+        assert manager.get_setting("matrix.sync_timeout") == 30000
+        manager.set_setting("matrix.sync_timeout", 1, save=False)
+        assert manager.get_setting("matrix.sync_timeout") == 1
+
+        manager.update_settings({"matrix.sync_timeout": 2, "emulator.personality": "wise_mentor"},
+                                save=False)
+        assert manager.get_setting("matrix.sync_timeout") == 2
+        assert manager.get_setting("emulator.personality") == "wise_mentor"
+
+    def test_replacing_a_section_updates_its_leaves(self, manager):
+        assert manager.get_setting("matrix.sync_timeout") == 30000
+        manager.set_setting("matrix", {"sync_timeout": 5}, save=False)
+
+        assert manager.get_setting("matrix.sync_timeout") == 5
+        assert manager.get_setting("matrix.homeserver", "gone") == "gone"
+
+    def test_writes_do_not_change_an_earlier_tree(self, manager):
+        before = manager.settings
+        manager.set_setting("matrix.sync_timeout", 1, save=False)
+
+        assert before["matrix"]["sync_timeout"] == 30000
+        assert manager.settings is not before
+
+    def test_returned_values_are_detached(self, manager):
+        users = manager.get_setting("matrix.authorized_users")
+        users.append("@intruder:example.org")
+        section = manager.get_setting("matrix")
+        section["sync_timeout"] = -1
+
+        assert "@intruder:example.org" not in manager.get_setting("matrix.authorized_users")
+        assert not manager.is_user_authorized("@intruder:example.org")
+        assert manager.get_setting("matrix.sync_timeout") == 30000
+
+    def test_derived_lookups_follow_writes(self, manager):
+        assert manager.add_authorized_user("@new:example.org", save=False)
+        assert manager.is_user_authorized("@new:example.org")
+
+        manager.reset_to_defaults("matrix", save=False)
+        assert not manager.is_user_authorized("@new:example.org")